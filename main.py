@@ -5,10 +5,15 @@ from pathlib import Path
 from src.doctor import DataDoctor
 from src.config_manager import ConfigManager
 
+PROJECT_ROOT = Path(__file__).resolve().parent
+CONFIG_PATH = str(PROJECT_ROOT / 'config' / 'config.yaml')
+ETL_SCRIPT = str(PROJECT_ROOT / 'src' / 'etl_pipeline.py')
+CHAOS_SCRIPT = str(PROJECT_ROOT / 'src' / 'chaos_monkey.py')
+
 def run_script(script_path):
-    print(f'\n✓ Running {os.path.basename(script_path)}...')
-    result = subprocess.run([sys.executable, script_path], capture_output=True, text=True)
-    print(result.stdout)
+    print(f'\n✓ Running {os.path.basename(script_path)}...', flush=True)
+    # stdout goes straight to the terminal; only stderr is captured for the doctor
+    result = subprocess.run([sys.executable, script_path], stderr=subprocess.PIPE, text=True)
     if result.returncode != 0:
         print(f'✗ Failed with error:\n{result.stderr}')
         return False, result.stderr
@@ -18,14 +23,12 @@ def main():
     print('🚀 Starting Self-Healing Pipeline Simulation (Real AI via OpenRouter)')
     print('=' * 70)
     
+    environment = os.getenv('ENVIRONMENT', 'development')
+    
     # Load configuration
     try:
         config_manager = ConfigManager()
-        project_root = Path(__file__).parent
-        config = config_manager.load_config(
-            str(project_root / 'config' / 'config.yaml'),
-            env=os.getenv('ENVIRONMENT', 'development')
-        )
+        config = config_manager.load_config(CONFIG_PATH, env=environment)
         print(f'📋 Configuration loaded: {config.environment.env} environment')
         print(f'🤖 AI Model: {config.ai.model}')
         print('=' * 70)
@@ -35,21 +38,18 @@ def main():
         return
     
     # Get paths from config
-    project_root = Path(__file__).parent
-    etl_script = str(project_root / 'src' / 'etl_pipeline.py')
-    chaos_script = str(project_root / 'src' / 'chaos_monkey.py')
     data_path = str(config.get_absolute_path(config.paths.data_dir) / 'users.csv')
     
     # 1. Inject Failure
     print('\n[Step 1] 💥 Injecting Failure...')
-    success, _ = run_script(chaos_script)
+    success, _ = run_script(CHAOS_SCRIPT)
     if not success:
         print('Chaos Monkey failed to run. Aborting.')
         return
 
     # 2. Run Pipeline (Expect Failure)
     print('\n[Step 2] 🔧 Running Pipeline (Expecting Failure)...')
-    success, error_log = run_script(etl_script)
+    success, error_log = run_script(ETL_SCRIPT)
     
     if success:
         print('✓ Pipeline succeeded unexpectedly! Is the data broken?')
@@ -60,12 +60,12 @@ def main():
     # 3. Call the Doctor
     print('\n[Step 3] 🏥 Calling Data Doctor with Real AI...')
     doctor = DataDoctor(config=config)
-    healed = doctor.diagnose_and_heal(etl_script, data_path, error_log)
+    healed = doctor.diagnose_and_heal(ETL_SCRIPT, data_path, error_log)
     
     if healed:
         # 4. Retry Pipeline
         print('\n[Step 4] 🔄 Retrying Pipeline...')
-        success, _ = run_script(etl_script)
+        success, _ = run_script(ETL_SCRIPT)
         if success:
             print('\n✅ SUCCESS! The pipeline healed itself using AI and ran successfully.')
         else:
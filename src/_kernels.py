@@ -0,0 +1,78 @@
+"""
+Array kernels behind the validation rules' fast paths.
+
+Compiled with Numba when it is installed; otherwise equivalent NumPy
+implementations are used. fastmath is deliberately off: it lets the compiler
+assume there are no NaNs, which would break null handling.
+"""
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+
+if njit is not None:
+
+    @njit(cache=True, parallel=True)
+    def count_nans_f64(a):
+        count = 0
+        for i in prange(a.shape[0]):
+            if np.isnan(a[i]):
+                count += 1
+        return count
+
+    @njit(cache=True, parallel=True)
+    def count_out_of_range_f64(a, lo, hi):
+        # NaN fails both comparisons, so nulls are never out of range
+        below = 0
+        above = 0
+        for i in prange(a.shape[0]):
+            if a[i] < lo:
+                below += 1
+            elif a[i] > hi:
+                above += 1
+        return below, above
+
+    @njit(cache=True, parallel=True)
+    def scan_f64(a, lo, hi):
+        # Nulls and both bounds in a single pass; x != x only for NaN
+        nulls = 0
+        below = 0
+        above = 0
+        for i in prange(a.shape[0]):
+            x = a[i]
+            if x != x:
+                nulls += 1
+            elif x < lo:
+                below += 1
+            elif x > hi:
+                above += 1
+        return nulls, below, above
+
+    @njit(cache=True)
+    def count_duplicates_i64(a):
+        if a.shape[0] < 2:
+            return 0
+        s = np.sort(a)
+        count = 0
+        for i in range(1, s.shape[0]):
+            if s[i] == s[i - 1]:
+                count += 1
+        return count
+
+else:
+
+    def count_nans_f64(a):
+        return int(np.isnan(a).sum())
+
+    def count_out_of_range_f64(a, lo, hi):
+        return int((a < lo).sum()), int((a > hi).sum())
+
+    def scan_f64(a, lo, hi):
+        below, above = count_out_of_range_f64(a, lo, hi)
+        return count_nans_f64(a), below, above
+
+    def count_duplicates_i64(a):
+        return len(a) - len(np.unique(a))
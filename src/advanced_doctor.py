@@ -1,19 +1,214 @@
-import pandas as pd
+import csv
+import itertools
+import re
 import sys
 import os
-from openai import OpenAI
+import io
+import shutil
+import contextlib
+import types
+import traceback
+import hashlib
+import difflib
+import time
+import threading
+from string import Template
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from src.rollback_manager import RollbackManager
 from src.error_analyzer import ErrorAnalyzer, ErrorCategory
 
+# Placeholder error for a speculative retry prompt, sent before the fix it
+# follows up on has finished testing
+_SPECULATIVE_PREVIOUS_ERROR = '<still running: the previous fix is being tested; its error is not known yet>'
+
+# Most successive renamed columns the rule-based fix patches before giving up
+_MAX_RULE_BASED_RENAMES = 5
+
+# Markdown code fence around a model response; the body is group 1
+_FENCE_RE = re.compile(r'^```(?:python)?[ \t]*\n?(.*?)(?:```|\Z)', re.DOTALL)
+
+def _infer_dtype(values):
+    '''Rough pandas-style dtype name for a column from a few sample values.'''
+    if not values:
+        return 'object'
+    for cast, name in ((int, 'int64'), (float, 'float64')):
+        try:
+            for v in values:
+                cast(v)
+            return name
+        except ValueError:
+            continue
+    return 'object'
+
+_DIAGNOSIS_TMPL = Template('''
+DIAGNOSIS:
+Category: $category
+Context: $context
+Strategy: $strategy
+''')
+
+_FIRST_PROMPT_TMPL = Template('''You are a data engineering expert. A Python ETL pipeline has failed.
+
+ERROR LOG:
+$error_log
+
+$diagnosis
+
+CURRENT CODE:
+$code
+
+DATA COLUMNS (from CSV):
+$data_head
+
+TASK: Fix the code to handle the error. Return ONLY the corrected Python code, nothing else. No explanations, no markdown formatting, just the raw Python code.''')
+
+_RETRY_PROMPT_TMPL = Template('''You are a data engineering expert. Your previous fix did not work.
+
+ORIGINAL ERROR:
+$error_log
+
+YOUR PREVIOUS FIX (Attempt $previous_attempt):
+$previous_fix
+
+NEW ERROR AFTER YOUR FIX:
+$previous_error
+
+$diagnosis
+
+DATA COLUMNS (from CSV):
+$data_head
+
+TASK: The previous fix failed. Analyze what went wrong and provide a BETTER fix. Return ONLY the corrected Python code, nothing else.''')
+
+# Bounded: every LLM candidate is new source, and a long-running healer must
+# not keep them all. Re-testing an identical fix still skips compile()
+@lru_cache(maxsize=32)
+def _compile_script(source, script_path):
+    '''Compile script source, reusing the code object for unchanged source.'''
+    return compile(source, script_path, 'exec')
+
+@lru_cache(maxsize=32)
+def _csv_probe(data_path, mtime_ns):
+    '''Header and two sample rows of a CSV, cached until the file's mtime changes.
+
+    Only the start of the file is read, with the stdlib csv module, so probing
+    the schema never pays for importing pandas.
+    '''
+    with open(data_path, newline='') as f:
+        reader = csv.reader(f)
+        columns = next(reader, None)
+        if columns is None:
+            raise ValueError('CSV file is empty')
+        sample = list(itertools.islice(reader, 2))
+    return tuple(columns), tuple(map(tuple, sample))
+
+@lru_cache(maxsize=32)
+def _schema_snapshot(data_path, mtime_ns, include_sample=False):
+    '''
+    Columns and dtypes of a CSV, formatted for the LLM prompt. Raw sample rows
+    are only included when include_sample is set; dtypes are inferred from
+    them either way.
+    '''
+    columns, sample = _csv_probe(data_path, mtime_ns)
+    columns, sample = list(columns), [list(row) for row in sample]
+    # Also get dtypes for type mismatch context
+    data_types = {
+        col: _infer_dtype([row[i] for row in sample if i < len(row) and row[i] != ''])
+        for i, col in enumerate(columns)
+    }
+    if include_sample:
+        return f"{columns}\nSample rows: {sample}\nData Types: {data_types}"
+    return f"{columns}\nData Types: {data_types}"
+
+def _rename_missing_column(code, missing_column, csv_columns):
+    '''Point quoted references to a vanished column at its most likely new name.
+
+    Candidates are CSV columns the code never mentions; a lone candidate is
+    taken as the rename, otherwise the closest name wins. Returns None when
+    no confident match exists.
+    '''
+    if missing_column in csv_columns:
+        return None
+    unreferenced = [c for c in csv_columns if f"'{c}'" not in code and f'"{c}"' not in code]
+    if len(unreferenced) == 1:
+        new_column = unreferenced[0]
+    else:
+        matches = difflib.get_close_matches(missing_column, unreferenced, n=1, cutoff=0.6)
+        if not matches:
+            return None
+        new_column = matches[0]
+    fixed_code = code.replace(f"'{missing_column}'", f"'{new_column}'").replace(f'"{missing_column}"', f'"{new_column}"')
+    return fixed_code if fixed_code != code else None
+
 class AdvancedLLM:
     def __init__(self, config):
         """Initialize LLM with configuration."""
         self.config = config
+        from openai import OpenAI
         self.client = OpenAI(
             api_key=config.ai.api_key,
             base_url=config.ai.base_url
         )
+        self.cache_dir = config.get_absolute_path(config.paths.cache_dir) / 'llm'
+        # Fix -> its cache file, until the fix has been tested (see record_result)
+        self._untested = {}
+        if config.performance.prewarm_connection:
+            threading.Thread(target=self._warmup, name='llm-warmup', daemon=True).start()
+
+    def _warmup(self):
+        '''Open the pooled connection (DNS, TCP, TLS) before the first fix request needs it.'''
+        try:
+            self.client.models.list()
+        except Exception:
+            pass
     
+    def _cache_path(self, prompt):
+        '''Content-addressed cache file for a model/prompt pair.'''
+        key = hashlib.sha256(f"{self.config.ai.model}\0{prompt}".encode('utf-8')).hexdigest()
+        return self.cache_dir / f'{key}.txt'
+
+    def _read_cached_fix(self, cache_path):
+        '''Return a previously generated fix if caching is on and it is still fresh.'''
+        if not self.config.performance.enable_caching:
+            return None
+        try:
+            age = time.time() - cache_path.stat().st_mtime
+            if age > self.config.performance.cache_ttl_hours * 3600:
+                return None
+            return cache_path.read_text(encoding='utf-8')
+        except OSError:
+            return None
+
+    def record_result(self, fixed_code, passed):
+        '''Cache a fix that passed its test; drop a cached one that failed.'''
+        cache_path = self._untested.pop(fixed_code, None)
+        if cache_path is None:
+            return
+        if passed:
+            self._write_cached_fix(cache_path, fixed_code)
+        else:
+            try:
+                cache_path.unlink()
+            except OSError:
+                pass
+
+    def discard_untested(self):
+        '''Forget fixes that were generated but never tested; they are not cached.'''
+        self._untested.clear()
+
+    def _write_cached_fix(self, cache_path, fixed_code):
+        '''Store a generated fix atomically; caching is best-effort.'''
+        if not self.config.performance.enable_caching:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_name(f'{cache_path.name}.{os.getpid()}.tmp')
+            tmp_path.write_text(fixed_code, encoding='utf-8')
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f'⚠ LLM: Could not cache fix: {e}')
+
     def generate_fix(self, error_log, code_content, data_head, attempt=1, previous_fix=None, previous_error=None, diagnosis=None):
         '''Generate fix with feedback from previous attempts.'''
         print(f'🤖 LLM: Analyzing error (Attempt {attempt}/{self.config.healing.max_attempts})...')
@@ -22,49 +217,38 @@ class AdvancedLLM:
         context_str = ""
         if diagnosis:
             print(f'🔍 Diagnosis: {diagnosis.category.value} - {diagnosis.suggested_fix_strategy}')
-            context_str = f"""
-DIAGNOSIS:
-Category: {diagnosis.category.value}
-Context: {diagnosis.context}
-Strategy: {diagnosis.suggested_fix_strategy}
-"""
+            context_str = _DIAGNOSIS_TMPL.substitute(
+                category=diagnosis.category.value,
+                context=diagnosis.context,
+                strategy=diagnosis.suggested_fix_strategy
+            )
 
         if attempt == 1:
-            prompt = f'''You are a data engineering expert. A Python ETL pipeline has failed.
-
-ERROR LOG:
-{error_log}
-
-{context_str}
-
-CURRENT CODE:
-{code_content}
-
-DATA COLUMNS (from CSV):
-{data_head}
-
-TASK: Fix the code to handle the error. Return ONLY the corrected Python code, nothing else. No explanations, no markdown formatting, just the raw Python code.'''
+            prompt = _FIRST_PROMPT_TMPL.substitute(
+                error_log=error_log,
+                diagnosis=context_str,
+                code=code_content,
+                data_head=data_head
+            )
         else:
-            prompt = f'''You are a data engineering expert. Your previous fix did not work.
-
-ORIGINAL ERROR:
-{error_log}
-
-YOUR PREVIOUS FIX (Attempt {attempt-1}):
-{previous_fix}
-
-NEW ERROR AFTER YOUR FIX:
-{previous_error}
-
-{context_str}
-
-DATA COLUMNS (from CSV):
-{data_head}
+            prompt = _RETRY_PROMPT_TMPL.substitute(
+                error_log=error_log,
+                previous_attempt=attempt - 1,
+                previous_fix=previous_fix,
+                previous_error=previous_error,
+                diagnosis=context_str,
+                data_head=data_head
+            )
 
-TASK: The previous fix failed. Analyze what went wrong and provide a BETTER fix. Return ONLY the corrected Python code, nothing else.'''
+        cache_path = self._cache_path(prompt)
+        cached_fix = self._read_cached_fix(cache_path)
+        if cached_fix is not None:
+            print(f'✓ LLM: Reusing cached fix for attempt {attempt}.')
+            self._untested[cached_fix] = cache_path
+            return cached_fix
 
         try:
-            response = self.client.chat.completions.create(
+            stream = self.client.chat.completions.create(
                 model=self.config.ai.model,
                 messages=[
                     {"role": "system", "content": "You are a code fixing assistant. Return only valid Python code with no explanations or markdown."},
@@ -72,17 +256,23 @@ TASK: The previous fix failed. Analyze what went wrong and provide a BETTER fix.
                 ],
                 temperature=self.config.ai.temperature,
                 max_tokens=self.config.ai.max_tokens,
-                timeout=self.config.ai.timeout
+                timeout=self.config.ai.timeout,
+                stream=True
             )
             
-            fixed_code = response.choices[0].message.content.strip()
+            parts = []
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+            fixed_code = ''.join(parts).strip()
             
             # Remove markdown code blocks if present
-            if fixed_code.startswith('```python'):
-                fixed_code = fixed_code.split('```python')[1].split('```')[0].strip()
-            elif fixed_code.startswith('```'):
-                fixed_code = fixed_code.split('```')[1].split('```')[0].strip()
+            match = _FENCE_RE.match(fixed_code)
+            if match:
+                fixed_code = match.group(1).strip()
             
+            # Only cached once it passes, so a failing fix is not replayed
+            self._untested[fixed_code] = cache_path
             print(f'✓ LLM: Fix generated for attempt {attempt}.')
             return fixed_code
             
@@ -91,7 +281,7 @@ TASK: The previous fix failed. Analyze what went wrong and provide a BETTER fix.
             return code_content
 
 class AdvancedDataDoctor:
-    def __init__(self, config=None, api_key=None, max_attempts=None):
+    def __init__(self, config=None, api_key=None, max_attempts=None, rollback_manager=None):
         """
         Initialize AdvancedDataDoctor with configuration.
         
@@ -99,6 +289,7 @@ class AdvancedDataDoctor:
             config: Config object (preferred)
             api_key: API key string (deprecated, for backward compatibility)
             max_attempts: Max healing attempts (deprecated, use config)
+            rollback_manager: RollbackManager to back up into (default backup dir if omitted)
         """
         if config:
             self.config = config
@@ -115,7 +306,7 @@ class AdvancedDataDoctor:
             self.max_attempts = max_attempts or 3
         else:
             raise ValueError('Either config or api_key is required')
-        self.rollback_manager = RollbackManager()
+        self.rollback_manager = rollback_manager or RollbackManager()
         self.analyzer = ErrorAnalyzer()
 
     def diagnose_and_heal(self, script_path, data_path, error_log):
@@ -125,70 +316,219 @@ class AdvancedDataDoctor:
         # 1. Analyze the error
         diagnosis = self.analyzer.analyze(error_log)
 
-        # Create backup before any changes
-        backup_path = self.rollback_manager.create_backup(script_path)
-        
-        # Read the broken code
-        with open(script_path, 'r') as f:
-            original_code = f.read()
-            
-        # Read the data head
-        try:
-            df = pd.read_csv(data_path, nrows=2)
-            data_head = str(df.columns.tolist())
-            # Also get dtypes for type mismatch context
-            data_types = str(df.dtypes.to_dict())
-            data_head += f"\nData Types: {data_types}"
-        except Exception as e:
-            data_head = f'Could not read data: {e}'
+        # Backup, script read and CSV probe are independent I/O, so overlap them
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            backup_future = pool.submit(self.rollback_manager.create_backup, script_path)
+            code_future = pool.submit(self._read_script, script_path)
+            head_future = pool.submit(self._read_data_head, data_path)
+            backup_path = backup_future.result()
+            original_code = code_future.result()
+            data_head = head_future.result()
+
+        # A KeyError on a renamed column can be patched without asking the LLM
+        if self._try_rule_based_fix(script_path, data_path, original_code, diagnosis):
+            return True
 
         current_code = original_code
         previous_fix = None
         previous_error = None
         
-        for attempt in range(1, self.max_attempts + 1):
-            print(f'\n Healing Attempt {attempt}/{self.max_attempts}')
-            
-            # Generate fix
-            fixed_code = self.llm.generate_fix(
-                error_log, 
-                current_code, # Pass current_code for the LLM to consider
-                data_head, 
-                attempt, 
-                previous_fix, 
-                previous_error,
-                diagnosis
-            )
-            
-            if fixed_code == current_code:
-                print(' Doctor could not generate a new fix.')
-                break # Exit loop if LLM can't generate a different fix
-            
-            # Apply the fix
-            print(' Applying fix...')
-            with open(script_path, 'w') as f:
-                f.write(fixed_code)
-            
-            # Test the fix
-            print(' Testing the fix...')
-            test_result, test_error = self._test_fix(script_path)
-            
-            if test_result:
-                print(f' Fix successful on attempt {attempt}!')
-                return True
-            else:
-                print(f' Fix failed. Error: {test_error}')
-                previous_fix = fixed_code
-                previous_error = test_error
-                current_code = fixed_code # Update current_code for the next attempt
+        # With speculative healing, the LLM call for attempt N+1 runs while attempt N
+        # is being tested; it is discarded if attempt N succeeds
+        speculative_pool = ThreadPoolExecutor(max_workers=1) if self.config.healing.speculative else None
+        next_fix = None
+        # A speculative call still running when the last heal returned may have
+        # added one candidate since that heal cleared them
+        self.llm.discard_untested()
+        try:
+            for attempt in range(1, self.max_attempts + 1):
+                print(f'\n Healing Attempt {attempt}/{self.max_attempts}')
+                
+                # Generate fix
+                if next_fix is not None:
+                    fixed_code = next_fix.result()
+                    next_fix = None
+                else:
+                    fixed_code = self.llm.generate_fix(
+                        error_log, 
+                        current_code, # Pass current_code for the LLM to consider
+                        data_head, 
+                        attempt, 
+                        previous_fix, 
+                        previous_error,
+                        diagnosis
+                    )
+                
+                if fixed_code == current_code:
+                    print(' Doctor could not generate a new fix.')
+                    break # Exit loop if LLM can't generate a different fix
+                
+                # Apply the fix
+                print(' Applying fix...')
+                self._write_script(script_path, fixed_code)
+                
+                if speculative_pool is not None and attempt < self.max_attempts:
+                    next_fix = speculative_pool.submit(
+                        self.llm.generate_fix,
+                        error_log,
+                        fixed_code,
+                        data_head,
+                        attempt + 1,
+                        fixed_code,
+                        _SPECULATIVE_PREVIOUS_ERROR,
+                        diagnosis
+                    )
+                
+                # Test the fix
+                print(' Testing the fix...')
+                test_result, test_error = self._test_fix(script_path)
+                self.llm.record_result(fixed_code, test_result)
+                
+                if test_result:
+                    print(f' Fix successful on attempt {attempt}!')
+                    return True
+                else:
+                    print(f' Fix failed. Error: {test_error}')
+                    previous_fix = fixed_code
+                    previous_error = test_error
+                    current_code = fixed_code # Update current_code for the next attempt
+        finally:
+            if speculative_pool is not None:
+                speculative_pool.shutdown(wait=False, cancel_futures=True)
+            # Candidates left untested (an error, a discarded speculative fix)
+            # would otherwise be held until the process exits
+            self.llm.discard_untested()
         
         # All attempts failed, rollback
         print(f'\n All {self.max_attempts} attempts failed. Rolling back...')
         self.rollback_manager.rollback(script_path, backup_path)
         return False
 
+    def _try_rule_based_fix(self, script_path, data_path, original_code, diagnosis):
+        '''
+        Apply a deterministic fix for schema drift, restoring the script if it fails.
+        Several columns are often renamed at once, so each KeyError the patched
+        script raises next is patched in turn, up to _MAX_RULE_BASED_RENAMES.
+        '''
+        missing_column = diagnosis.context.get('missing_column')
+        if diagnosis.category != ErrorCategory.SCHEMA_DRIFT or not missing_column:
+            return False
+        try:
+            csv_columns, _ = _csv_probe(data_path, os.stat(data_path).st_mtime_ns)
+        except Exception:
+            return False
+
+        code = original_code
+        for _ in range(_MAX_RULE_BASED_RENAMES):
+            fixed_code = _rename_missing_column(code, missing_column, csv_columns)
+            if fixed_code is None:
+                break
+            print(f' Applying rule-based fix for missing column {missing_column!r}...')
+            self._write_script(script_path, fixed_code)
+            test_result, test_error = self._test_fix(script_path)
+            if test_result:
+                print(' Rule-based fix successful!')
+                return True
+            code = fixed_code
+            next_diagnosis = self.analyzer.analyze(test_error or '')
+            if next_diagnosis.category != ErrorCategory.SCHEMA_DRIFT:
+                break
+            missing_column = next_diagnosis.context.get('missing_column')
+            if not missing_column:
+                break
+
+        if code is not original_code:
+            print(' Rule-based fix failed, falling back to LLM.')
+            self._write_script(script_path, original_code)
+        return False
+
+    def _read_script(self, script_path):
+        '''Read the current contents of the ETL script.'''
+        with open(script_path, 'rb') as f:
+            return f.read().decode('utf-8')
+
+    def _write_script(self, script_path, code):
+        '''Replace the ETL script atomically so an interrupted write cannot truncate it.'''
+        tmp_path = f'{script_path}.{os.getpid()}.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(code.encode('utf-8'))
+            # Keep the script's permissions (e.g. its executable bit)
+            shutil.copymode(script_path, tmp_path)
+            os.replace(tmp_path, script_path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_path)
+            raise
+
+    def _read_data_head(self, data_path):
+        '''Describe the CSV columns and dtypes for the LLM prompt.'''
+        try:
+            # Row values can hold personal data; they leave the process only
+            # when masking is switched off
+            return _schema_snapshot(
+                data_path, os.stat(data_path).st_mtime_ns,
+                include_sample=not self.config.security.mask_sensitive_data
+            )
+        except Exception as e:
+            return f'Could not read data: {e}'
+
     def _test_fix(self, script_path):
         '''Test if the fix works by running the script.'''
+        # A speculative LLM call prints from another thread, which would leak into
+        # the redirected stdout of an in-process run
+        if self.config.healing.isolate_test_runs or self.config.healing.speculative:
+            return self._test_fix_subprocess(script_path)
+        return self._test_fix_in_process(script_path)
+
+    def _test_fix_in_process(self, script_path):
+        '''Run the script as __main__ in this interpreter, capturing its output.
+
+        Opt-in (isolate_test_runs: false): the fix runs inside the doctor's own
+        process, so only use it for trusted scripts. Avoids a fresh interpreter
+        (and pandas/openai imports) per attempt. cwd and argv are restored.
+        Modules the script imported from its own directory are dropped
+        afterwards so the next attempt re-imports anything the fix touched.
+        '''
+        script_dir = os.path.dirname(os.path.abspath(script_path))
+        buf = io.StringIO()
+        main_module = types.ModuleType('__main__')
+        main_module.__file__ = script_path
+        saved_main = sys.modules['__main__']
+        saved_modules = set(sys.modules)
+        saved_argv = sys.argv
+        saved_cwd = os.getcwd()
+        sys.argv = [script_path]
+        # Mirror `python script.py`, which puts the script's directory first
+        sys.path.insert(0, script_dir)
+        sys.modules['__main__'] = main_module
+        try:
+            with contextlib.redirect_stdout(buf), contextlib.redirect_stderr(buf):
+                with open(script_path, 'rb') as f:
+                    code = _compile_script(f.read(), script_path)
+                exec(code, main_module.__dict__)
+            return True, None
+        except SystemExit as e:
+            if e.code in (0, None):
+                return True, None
+            return False, buf.getvalue() or f'SystemExit: {e.code}'
+        except BaseException:
+            return False, buf.getvalue() + traceback.format_exc()
+        finally:
+            sys.modules['__main__'] = saved_main
+            sys.argv = saved_argv
+            os.chdir(saved_cwd)
+            if script_dir in sys.path:
+                sys.path.remove(script_dir)
+            # Trailing separator, so a sibling such as src_old/ is not matched by src
+            dir_prefix = os.path.join(script_dir, '')
+            for name in set(sys.modules) - saved_modules:
+                module_file = getattr(sys.modules[name], '__file__', None) or ''
+                if module_file.startswith(dir_prefix):
+                    del sys.modules[name]
+
+    def _test_fix_subprocess(self, script_path):
+        '''Run the script in a separate interpreter.'''
         import subprocess
         result = subprocess.run([sys.executable, script_path], capture_output=True, text=True)
         if result.returncode == 0:
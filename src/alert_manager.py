@@ -1,61 +1,194 @@
+import atexit
 import time
 import logging
-import requests
+import queue
+import threading
+import weakref
+from collections import OrderedDict
 from typing import Dict, Optional
 from src.config_schema import Config
 
+try:
+    import orjson
+
+    def _dumps(payload) -> bytes:
+        return orjson.dumps(payload)
+except ImportError:
+    import json
+
+    def _dumps(payload) -> bytes:
+        return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+# (connect, read) seconds; the webhook answers quickly or not at all
+_SLACK_TIMEOUT = (1.0, 2.5)
+# Retry connection failures and rate limiting/gateway errors with backoff. Read
+# errors are not retried: the POST may already have been delivered
+_SLACK_RETRY_OPTIONS = dict(
+    total=3,
+    read=0,
+    backoff_factor=0.3,
+    status_forcelist=(429, 502, 503, 504),
+    allowed_methods=frozenset({"POST"}),
+    raise_on_status=False,
+)
+# Most queued alerts the worker coalesces into one webhook POST
+_SLACK_BATCH_SIZE = 20
+# Longest flush() waits by default, so an unreachable webhook cannot hang exit (seconds)
+_FLUSH_TIMEOUT = 5.0
+
+def _new_slack_session():
+    """
+    Session for the Slack worker. requests is imported here so processes that
+    never send to Slack do not pay for importing it.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(
+        pool_connections=2, pool_maxsize=4, max_retries=Retry(**_SLACK_RETRY_OPTIONS)
+    ))
+    return session
+
+# Managers with a running Slack worker; one atexit hook drains them all
+_started_managers: "weakref.WeakSet[AlertManager]" = weakref.WeakSet()
+
+@atexit.register
+def _flush_at_exit():
+    """Deliver alerts still queued when the process exits; the daemon workers die with it."""
+    for manager in list(_started_managers):
+        manager.flush()
+
 class AlertManager:
     def __init__(self, config: Config):
         self.config = config
         self.logger = logging.getLogger(__name__)
-        self.last_alert_times: Dict[str, float] = {}
+        # Title -> time first sent (monotonic clock), oldest first; bounded so
+        # high-cardinality titles cannot grow it forever in a long-running process
+        self.last_alert_times: "OrderedDict[str, float]" = OrderedDict()
         self.deduplication_window = 300  # 5 minutes
+        self.max_tracked_alerts = 4096
+        
+        # Slack delivery runs on a daemon thread so callers never block on HTTP;
+        # one Session keeps the TLS connection to the webhook host alive
+        self._slack_queue: "queue.Queue[dict]" = queue.Queue(maxsize=1024)
+        self._slack_worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self._session = None  # Created with the worker
+        self._attachment_template = {
+            "color": None,
+            "title": None,
+            "text": None,
+            "footer": "Self-Healing Pipeline",
+            "ts": 0,
+        }
 
     def send_alert(self, title: str, message: str, level: str = "error"):
         """
         Send an alert to configured channels (Slack, Log).
         Deduplicates alerts based on title.
         """
-        # Deduplication check
-        current_time = time.time()
+        # Deduplication check; monotonic so wall-clock adjustments cannot shift the window
+        current_time = time.monotonic()
+        self._expire_alerts(current_time)
         if title in self.last_alert_times:
-            if current_time - self.last_alert_times[title] < self.deduplication_window:
-                self.logger.info(f"Suppressed duplicate alert: {title}")
-                return
+            self.logger.info("Suppressed duplicate alert: %s", title)
+            return
         
         self.last_alert_times[title] = current_time
+        if len(self.last_alert_times) > self.max_tracked_alerts:
+            self.last_alert_times.popitem(last=False)
         
-        # Log the alert
-        log_msg = f"[{level.upper()}] {title}: {message}"
-        if level == "error":
-            self.logger.error(log_msg)
-        else:
-            self.logger.warning(log_msg)
+        # Log the alert; %-style args are only formatted if a handler takes the record
+        log_level = logging.ERROR if level == "error" else logging.WARNING
+        self.logger.log(log_level, "[%s] %s: %s", level.upper(), title, message)
             
         # Send to Slack if configured
         if self.config.monitoring and self.config.monitoring.slack_webhook_url:
             self._send_slack(title, message, level)
 
+    def _expire_alerts(self, current_time: float):
+        """Forget alerts sent longer ago than the deduplication window."""
+        cutoff = current_time - self.deduplication_window
+        while self.last_alert_times:
+            oldest_title, sent_at = next(iter(self.last_alert_times.items()))
+            if sent_at > cutoff:
+                break
+            del self.last_alert_times[oldest_title]
+
     def _send_slack(self, title: str, message: str, level: str):
-        color = "#FF0000" if level == "error" else "#FFA500"
-        payload = {
-            "attachments": [
-                {
-                    "color": color,
-                    "title": title,
-                    "text": message,
-                    "footer": "Self-Healing Pipeline",
-                    "ts": int(time.time())
-                }
-            ]
-        }
+        # Payloads sit in the delivery queue, so copy the template rather than mutate it
+        attachment = self._attachment_template.copy()
+        attachment["color"] = "#FF0000" if level == "error" else "#FFA500"
+        attachment["title"] = title
+        attachment["text"] = message
+        attachment["ts"] = time.time_ns() // 1_000_000_000
         
+        if self._slack_worker is None:
+            with self._worker_lock:
+                if self._slack_worker is None:
+                    self._start_slack_worker()
         try:
-            response = requests.post(
-                self.config.monitoring.slack_webhook_url, 
-                json=payload, 
-                timeout=5
-            )
-            response.raise_for_status()
-        except Exception as e:
-            self.logger.error(f"Failed to send Slack alert: {e}")
+            self._slack_queue.put_nowait(attachment)
+        except queue.Full:
+            self.logger.warning("Slack alert queue full, dropping alert: %s", title)
+
+    def _start_slack_worker(self):
+        """Start the delivery thread; the caller holds _worker_lock."""
+        self._session = _new_slack_session()
+        worker = threading.Thread(target=self._drain_slack_queue, name="slack-alerts", daemon=True)
+        worker.start()
+        self._slack_worker = worker
+        _started_managers.add(self)
+
+    def _drain_slack_queue(self):
+        """
+        Deliver queued Slack alerts over the shared session. Alerts that queued
+        up while the previous POST was in flight go out together as one message.
+        """
+        while True:
+            batch = [self._slack_queue.get()]
+            while len(batch) < _SLACK_BATCH_SIZE:
+                try:
+                    batch.append(self._slack_queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                response = self._session.post(
+                    self.config.monitoring.slack_webhook_url, 
+                    data=_dumps({"attachments": batch}), 
+                    headers=_JSON_HEADERS,
+                    timeout=_SLACK_TIMEOUT
+                )
+                response.raise_for_status()
+            except Exception as e:
+                self.logger.error("Failed to send %d Slack alert(s): %s", len(batch), e)
+            finally:
+                for _ in batch:
+                    self._slack_queue.task_done()
+
+    def flush(self, timeout: Optional[float] = _FLUSH_TIMEOUT) -> bool:
+        """
+        Wait until every queued Slack alert has been delivered (or failed), for
+        at most timeout seconds; None waits indefinitely. Returns False if
+        alerts were still pending when the time ran out.
+        """
+        slack_queue = self._slack_queue
+        deadline = None if timeout is None else time.monotonic() + timeout
+        # Queue.join() without the unbounded wait
+        with slack_queue.all_tasks_done:
+            while slack_queue.unfinished_tasks:
+                if deadline is None:
+                    slack_queue.all_tasks_done.wait()
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.logger.warning(
+                        "Gave up waiting for %d Slack alert(s) after %.1fs",
+                        slack_queue.unfinished_tasks, timeout
+                    )
+                    return False
+                slack_queue.all_tasks_done.wait(remaining)
+        return True
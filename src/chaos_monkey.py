@@ -1,22 +1,42 @@
-import pandas as pd
+import csv
+import io
+import os
+import shutil
 import random
 
+# Simulated breaking changes: old column name -> new column name
+RENAMES = {
+    'user_id': 'uid',
+    'full_name': 'customer_name',
+}
+
 def unleash_chaos():
     print(' Chaos Monkey is loose! modifying schema...')
     file_path = r'E:\self_healing_pipeline\data\raw\users.csv'
-    df = pd.read_csv(file_path)
-    
-    # Simulate a breaking change: 'user_id' -> 'uid'
-    if 'user_id' in df.columns:
-        df = df.rename(columns={'user_id': 'uid'})
-        print('Changed column: user_id -> uid')
-    
-    # Simulate another change: 'full_name' -> 'customer_name'
-    if 'full_name' in df.columns:
-        df = df.rename(columns={'full_name': 'customer_name'})
-        print('Changed column: full_name -> customer_name')
-        
-    df.to_csv(file_path, index=False)
+
+    # Only the header changes, so rewrite that line and copy the body verbatim
+    with open(file_path, 'rb') as src:
+        first_line = src.readline()
+        header_text = first_line.decode('utf-8')
+        line_ending = header_text[len(header_text.rstrip('\r\n')):]
+        columns = next(csv.reader([header_text.rstrip('\r\n')]))
+
+        renamed = []
+        for col in columns:
+            if col in RENAMES:
+                print(f'Changed column: {col} -> {RENAMES[col]}')
+                renamed.append(RENAMES[col])
+            else:
+                renamed.append(col)
+
+        header_buf = io.StringIO()
+        csv.writer(header_buf, lineterminator=line_ending or '\n').writerow(renamed)
+
+        tmp_path = f'{file_path}.tmp'
+        with open(tmp_path, 'wb') as out:
+            out.write(header_buf.getvalue().encode('utf-8'))
+            shutil.copyfileobj(src, out, length=1 << 20)
+    os.replace(tmp_path, file_path)
     print('Chaos unleashed. Schema corrupted.')
 
 if __name__ == '__main__':
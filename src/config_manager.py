@@ -4,14 +4,52 @@ Supports YAML files, environment variables, and environment-specific configs.
 """
 import yaml
 import os
+import copy
+import threading
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Dict, Any
-from dotenv import load_dotenv
+from typing import Optional, Dict, Any, IO, Union
 from src.config_schema import Config
 import logging
 
 logger = logging.getLogger(__name__)
 
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Prefer the libyaml-backed loader; fall back to the pure-Python one.
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+# Prefix for environment variable overrides (SHP = Self-Healing Pipeline)
+_ENV_PREFIX = 'SHP_'
+
+_BOOL_MAP = {
+    'true': True, 'yes': True, '1': True, 'on': True,
+    'false': False, 'no': False, '0': False, 'off': False,
+}
+
+
+@lru_cache(maxsize=1024)
+def _convert_env_value(value: str) -> Any:
+    """Pure string-to-type conversion behind ConfigManager._convert_env_value."""
+    # Boolean conversion
+    flag = _BOOL_MAP.get(value.lower())
+    if flag is not None:
+        return flag
+    
+    # Numeric conversion
+    try:
+        if '.' in value:
+            return float(value)
+        return int(value)
+    except ValueError:
+        pass
+    
+    # Return as string
+    return value
+
 
 class ConfigManager:
     """
@@ -26,11 +64,18 @@ class ConfigManager:
     
     _instance: Optional['ConfigManager'] = None
     _config: Optional[Config] = None
+    _lock = threading.Lock()
+    # Parsed YAML keyed on (path, mtime_ns, size); survives reset() because
+    # an edited file gets a new key
+    _yaml_cache: Dict[tuple, Dict[str, Any]] = {}
     
     def __new__(cls):
         """Singleton pattern to ensure only one config instance."""
+        # Double-checked so the steady state never takes the lock
         if cls._instance is None:
-            cls._instance = super(ConfigManager, cls).__new__(cls)
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super(ConfigManager, cls).__new__(cls)
         return cls._instance
     
     def __init__(self):
@@ -41,7 +86,7 @@ class ConfigManager:
     
     def load_config(
         self,
-        config_path: Optional[str] = None,
+        config_path: Optional[Union[str, Path, IO[str]]] = None,
         env: Optional[str] = None,
         load_env_file: bool = True
     ) -> Config:
@@ -49,7 +94,9 @@ class ConfigManager:
         Load configuration from YAML file and environment variables.
         
         Args:
-            config_path: Path to main config file (default: config/config.yaml)
+            config_path: Path to main config file (default: config/config.yaml),
+                or a text stream of YAML. Streams have no environment-specific
+                file to merge and are never cached.
             env: Environment name (development/staging/production)
             load_env_file: Whether to load .env file
             
@@ -63,53 +110,98 @@ class ConfigManager:
         # Load .env file if requested
         if load_env_file:
             env_file = Path('.env')
-            if env_file.exists():
+            if os.path.isfile(env_file):
+                from dotenv import load_dotenv
                 load_dotenv(env_file)
                 logger.info(f"Loaded environment variables from {env_file}")
         
+        if hasattr(config_path, 'read'):
+            return self._load_config_stream(config_path, env)
+        
         # Determine config file path
         if config_path is None:
-            project_root = Path(__file__).parent.parent
-            config_path = project_root / "config" / "config.yaml"
+            config_path = _PROJECT_ROOT / "config" / "config.yaml"
         else:
             config_path = Path(config_path)
         
-        # Load base configuration
-        base_config = self._load_yaml_file(config_path)
-        
         # Determine environment
         if env is None:
             env = os.getenv('ENVIRONMENT', os.getenv('ENV', 'development'))
+        env_config_path = config_path.parent / f"config.{env}.yaml"
+        
+        # Stat each file once; the results key the YAML caches
+        base_st = self._stat_config_file(config_path)
+        try:
+            env_st = os.stat(env_config_path)
+        except FileNotFoundError:
+            env_st = None
+        
+        # Load base configuration
+        base_config = self._load_yaml_file(config_path, base_st)
         
         # Load environment-specific config if exists
-        env_config_path = config_path.parent / f"config.{env}.yaml"
-        if env_config_path.exists():
-            env_config = self._load_yaml_file(env_config_path)
+        if env_st is not None:
+            env_config = self._load_yaml_file(env_config_path, env_st)
             base_config = self._deep_merge(base_config, env_config)
             logger.info(f"Merged environment config from {env_config_path}")
         
+        config = self._build_config(base_config, env)
+        # Publish only the finished object; get_config reads it without locking
+        self._config = config
+        return config
+    
+    def _load_config_stream(self, stream: IO[str], env: Optional[str]) -> Config:
+        """Load configuration from an in-memory YAML stream."""
+        try:
+            base_config = yaml.load(stream.read(), Loader=SafeLoader)
+        except yaml.YAMLError as e:
+            raise ValueError(f"Invalid YAML in {stream!r}: {e}")
+        if base_config is None:
+            base_config = {}
+        if env is None:
+            env = os.getenv('ENVIRONMENT', os.getenv('ENV', 'development'))
+        
+        config = self._build_config(base_config, env)
+        self._config = config
+        return config
+    
+    def _build_config(self, base_config: Dict[str, Any], env: str) -> Config:
+        """Apply environment variable overrides, validate, and create directories."""
         # Override with environment variables
         base_config = self._apply_env_overrides(base_config)
         
         # Validate and create Config object
         try:
-            self._config = Config(**base_config)
+            # Validates the merged dict directly with Config's prebuilt validator
+            config = Config.model_validate(base_config)
             logger.info(f"Configuration loaded successfully for environment: {env}")
             
             # Ensure required directories exist
-            self._config.ensure_directories()
-            
-            return self._config
+            config.ensure_directories()
         except Exception as e:
             logger.error(f"Configuration validation failed: {e}")
             raise ValueError(f"Invalid configuration: {e}")
+        return config
     
-    def _load_yaml_file(self, file_path: Path) -> Dict[str, Any]:
+    def _stat_config_file(self, file_path: Path) -> os.stat_result:
+        """
+        Stat a required config file.
+        
+        Raises:
+            FileNotFoundError: If file doesn't exist
+        """
+        try:
+            return os.stat(file_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Configuration file not found: {file_path}") from None
+    
+    def _load_yaml_file(self, file_path: Path, st: Optional[os.stat_result] = None) -> Dict[str, Any]:
         """
         Load YAML file and return as dictionary.
         
         Args:
             file_path: Path to YAML file
+            st: stat result for file_path, if the caller already has one
             
         Returns:
             Dictionary with config data
@@ -118,40 +210,72 @@ class ConfigManager:
             FileNotFoundError: If file doesn't exist
             yaml.YAMLError: If YAML is malformed
         """
-        if not file_path.exists():
-            raise FileNotFoundError(f"Configuration file not found: {file_path}")
+        if st is None:
+            st = self._stat_config_file(file_path)
+        
+        # Parsed YAML is memoized in-process, keyed on mtime and size, so an
+        # unchanged file is never re-parsed. Callers mutate the result (env
+        # overrides), so hand out deep copies.
+        memo_key = (str(file_path), st.st_mtime_ns, st.st_size)
+        cached = self._yaml_cache.get(memo_key)
+        if cached is not None:
+            return copy.deepcopy(cached)
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
-                if data is None:
-                    return {}
-                return data
+            # Hand libyaml the raw bytes; it decodes UTF-8 itself, faster than a
+            # Python-level text read followed by parsing a stream
+            with open(file_path, 'rb') as f:
+                raw = f.read()
+            data = yaml.load(raw, Loader=SafeLoader)
+            if data is None:
+                data = {}
         except yaml.YAMLError as e:
             raise ValueError(f"Invalid YAML in {file_path}: {e}")
         except Exception as e:
             raise ValueError(f"Error reading {file_path}: {e}")
+        
+        self._remember_yaml(memo_key, data)
+        return copy.deepcopy(data)
+    
+    def _remember_yaml(self, memo_key: tuple, data: Dict[str, Any]) -> None:
+        """
+        Memoize parsed YAML, dropping entries for older versions of the same file.
+        
+        Args:
+            memo_key: (path, mtime_ns, size) of the parsed file
+            data: Parsed YAML data
+        """
+        with self._lock:
+            for key in [k for k in self._yaml_cache if k[0] == memo_key[0]]:
+                del self._yaml_cache[key]
+            self._yaml_cache[memo_key] = data
     
     def _deep_merge(self, base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Deep merge two dictionaries, with override taking precedence.
+        Deep merge override into base in place, with override taking precedence.
+        
+        Walks nested sections with an explicit stack instead of recursing and
+        copying each level. Callers pass freshly loaded dicts, so mutating base
+        is safe; deep-copy beforehand if the original must be kept.
         
         Args:
-            base: Base dictionary
+            base: Base dictionary (modified in place)
             override: Override dictionary
             
         Returns:
-            Merged dictionary
+            The merged base dictionary
         """
-        result = base.copy()
-        
-        for key, value in override.items():
-            if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-                result[key] = self._deep_merge(result[key], value)
-            else:
-                result[key] = value
+        stack = [(base, override)]
+        while stack:
+            target, source = stack.pop()
+            for key, value in source.items():
+                current = target.get(key)
+                if isinstance(current, dict) and isinstance(value, dict):
+                    stack.append((current, value))
+                else:
+                    target[key] = value
         
-        return result
+        return base
     
     def _apply_env_overrides(self, config: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -168,30 +292,42 @@ class ConfigManager:
         Returns:
             Configuration with environment overrides applied
         """
-        prefix = 'SHP_'
+        # Common case: no overrides at all, stop at the first SHP_ variable found
+        for env_key in os.environ:
+            if env_key.startswith(_ENV_PREFIX):
+                break
+        else:
+            return config
         
-        for env_key, env_value in os.environ.items():
-            if not env_key.startswith(prefix):
-                continue
-            
-            # Remove prefix and split by double underscore
-            key_path = env_key[len(prefix):].lower().split('__')
-            
+        for env_key, key_path, value in self._parse_env_overrides():
             # Navigate to the nested location
             current = config
-            for i, key in enumerate(key_path[:-1]):
+            for key in key_path[:-1]:
                 if key not in current:
                     current[key] = {}
                 current = current[key]
             
-            # Set the value (convert types as needed)
-            final_key = key_path[-1]
-            current[final_key] = self._convert_env_value(env_value)
+            # Set the value
+            current[key_path[-1]] = value
             
             logger.debug(f"Applied environment override: {env_key} -> {'.'.join(key_path)}")
         
         return config
     
+    def _parse_env_overrides(self) -> list:
+        """
+        Split and convert SHP_* environment variables into override entries.
+        
+        Returns:
+            List of (env_key, key_path, converted_value) tuples
+        """
+        # Remove prefix and split by double underscore
+        return [
+            (env_key, tuple(env_key[len(_ENV_PREFIX):].lower().split('__')), self._convert_env_value(env_value))
+            for env_key, env_value in os.environ.items()
+            if env_key.startswith(_ENV_PREFIX)
+        ]
+    
     def _convert_env_value(self, value: str) -> Any:
         """
         Convert environment variable string to appropriate Python type.
@@ -202,22 +338,7 @@ class ConfigManager:
         Returns:
             Converted value (bool, int, float, or str)
         """
-        # Boolean conversion
-        if value.lower() in ('true', 'yes', '1', 'on'):
-            return True
-        if value.lower() in ('false', 'no', '0', 'off'):
-            return False
-        
-        # Numeric conversion
-        try:
-            if '.' in value:
-                return float(value)
-            return int(value)
-        except ValueError:
-            pass
-        
-        # Return as string
-        return value
+        return _convert_env_value(value)
     
     def get_config(self) -> Config:
         """
@@ -253,6 +374,13 @@ class ConfigManager:
         cls._instance = None
         cls._config = None
 
+    @classmethod
+    def _new_for_testing(cls) -> 'ConfigManager':
+        """Create an unshared instance, leaving the singleton untouched."""
+        instance = object.__new__(cls)
+        instance._config = None
+        return instance
+
 
 # Convenience function for getting config
 def get_config() -> Config:
@@ -266,3 +394,4 @@ def get_config() -> Config:
         RuntimeError: If config hasn't been loaded
     """
     return ConfigManager().get_config()
+
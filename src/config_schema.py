@@ -6,17 +6,20 @@ from typing import Optional, Dict, Any, List
 from pathlib import Path
 import os
 
+# Project root is the parent of the src directory; resolved once at import
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
 
 class PathConfig(BaseModel):
     """Path configuration for data and logs."""
-    model_config = ConfigDict(arbitrary_types_allowed=True)
+    model_config = ConfigDict(frozen=True, extra='ignore', arbitrary_types_allowed=True)
     
     data_dir: Path = Field(default=Path("data/raw"), description="Directory for raw data files")
     logs_dir: Path = Field(default=Path("logs"), description="Directory for log files")
     dashboard_dir: Path = Field(default=Path("dashboard"), description="Directory for dashboard files")
     backup_dir: Path = Field(default=Path("backups"), description="Directory for backup files")
+    cache_dir: Path = Field(default=Path(".cache"), description="Directory for cached AI responses")
     
-    @field_validator('data_dir', 'logs_dir', 'dashboard_dir', 'backup_dir', mode='before')
+    @field_validator('data_dir', 'logs_dir', 'dashboard_dir', 'backup_dir', 'cache_dir', mode='before')
     @classmethod
     def resolve_path(cls, v):
         """Convert string paths to Path objects and resolve them."""
@@ -29,6 +32,7 @@ class PathConfig(BaseModel):
 
 class AIConfig(BaseModel):
     """AI/LLM configuration."""
+    model_config = ConfigDict(frozen=True, extra='ignore')
     api_key: str = Field(..., description="API key for AI service")
     base_url: str = Field(default="https://openrouter.ai/api/v1", description="Base URL for AI API")
     model: str = Field(default="openai/gpt-4o-mini", description="Model to use for healing")
@@ -48,15 +52,19 @@ class AIConfig(BaseModel):
 
 class HealingConfig(BaseModel):
     """Configuration for healing behavior."""
+    model_config = ConfigDict(frozen=True, extra='ignore')
     max_attempts: int = Field(default=3, ge=1, le=10, description="Maximum healing attempts")
     enable_rollback: bool = Field(default=True, description="Enable automatic rollback on failure")
     enable_backup: bool = Field(default=True, description="Enable backup before healing")
     test_before_apply: bool = Field(default=True, description="Test fix before applying")
+    isolate_test_runs: bool = Field(default=True, description="Test fixes in a subprocess; false runs generated code inside the doctor process")
+    speculative: bool = Field(default=False, description="Request the next fix while the current one is tested (uses extra tokens, implies isolated test runs)")
     backup_retention_days: int = Field(default=30, ge=1, description="Days to retain backups")
     
     
 class MonitoringConfig(BaseModel):
     """Monitoring and alerting configuration."""
+    model_config = ConfigDict(frozen=True, extra='ignore')
     enable_monitoring: bool = Field(default=True, description="Enable monitoring")
     slack_webhook_url: Optional[str] = Field(default=None, description="Slack webhook URL for notifications")
     enable_dashboard: bool = Field(default=True, description="Enable HTML dashboard generation")
@@ -67,6 +75,7 @@ class MonitoringConfig(BaseModel):
 
 class GitHubConfig(BaseModel):
     """GitHub integration configuration."""
+    model_config = ConfigDict(frozen=True, extra='ignore')
     enable_github: bool = Field(default=False, description="Enable GitHub integration")
     token: Optional[str] = Field(default=None, description="GitHub personal access token")
     repo_name: Optional[str] = Field(default=None, description="Repository name (username/repo)")
@@ -83,6 +92,7 @@ class GitHubConfig(BaseModel):
 
 class SecurityConfig(BaseModel):
     """Security and compliance configuration."""
+    model_config = ConfigDict(frozen=True, extra='ignore')
     enable_audit_log: bool = Field(default=True, description="Enable audit logging")
     mask_sensitive_data: bool = Field(default=True, description="Mask sensitive data in logs")
     enable_code_signing: bool = Field(default=False, description="Enable code signing for AI fixes")
@@ -91,14 +101,17 @@ class SecurityConfig(BaseModel):
 
 class PerformanceConfig(BaseModel):
     """Performance and scalability configuration."""
+    model_config = ConfigDict(frozen=True, extra='ignore')
     enable_caching: bool = Field(default=True, description="Enable AI response caching")
     cache_ttl_hours: int = Field(default=24, ge=1, description="Cache TTL in hours")
     max_parallel_healings: int = Field(default=1, ge=1, le=10, description="Max parallel healing operations")
     rate_limit_per_minute: int = Field(default=10, ge=1, description="AI API rate limit per minute")
+    prewarm_connection: bool = Field(default=False, description="Open the AI API connection in the background at startup (sends an authenticated request)")
 
 
 class EnvironmentConfig(BaseModel):
     """Environment-specific configuration."""
+    model_config = ConfigDict(frozen=True, extra='ignore')
     env: str = Field(default="development", description="Environment name (development/staging/production)")
     debug: bool = Field(default=False, description="Enable debug mode")
     log_level: str = Field(default="INFO", description="Logging level")
@@ -124,7 +137,7 @@ class EnvironmentConfig(BaseModel):
 
 class Config(BaseModel):
     """Main configuration object combining all sub-configurations."""
-    model_config = ConfigDict(arbitrary_types_allowed=True)
+    model_config = ConfigDict(frozen=True, extra='ignore', arbitrary_types_allowed=True)
     
     environment: EnvironmentConfig = Field(default_factory=EnvironmentConfig)
     paths: PathConfig = Field(default_factory=PathConfig)
@@ -150,13 +163,19 @@ class Config(BaseModel):
         """Convert relative path to absolute path based on project root."""
         if relative_path.is_absolute():
             return relative_path
-        # Assume project root is parent of src directory
-        project_root = Path(__file__).parent.parent
-        return (project_root / relative_path).resolve()
+        # resolve() rather than a lexical normpath: a '..' after a symlinked
+        # component must step out of the link's target, not the link
+        return (_PROJECT_ROOT / relative_path).resolve()
     
     def ensure_directories(self):
         """Create all required directories if they don't exist."""
-        for path_field in ['data_dir', 'logs_dir', 'dashboard_dir', 'backup_dir']:
-            path = getattr(self.paths, path_field)
-            abs_path = self.get_absolute_path(path)
-            abs_path.mkdir(parents=True, exist_ok=True)
+        # Deduplicated, since several fields may point at the same directory
+        paths = frozenset(
+            self.get_absolute_path(getattr(self.paths, path_field))
+            for path_field in ['data_dir', 'logs_dir', 'dashboard_dir', 'backup_dir', 'cache_dir']
+        )
+        # One stat per directory; checked every time, since a directory can be
+        # removed (log rotation, cleanup) after an earlier load created it
+        for abs_path in paths:
+            if not abs_path.is_dir():
+                abs_path.mkdir(parents=True, exist_ok=True)
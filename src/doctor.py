@@ -1,13 +1,54 @@
-import pandas as pd
+import re
 import sys
 import os
-from openai import OpenAI
+from functools import lru_cache
 from src.error_analyzer import ErrorAnalyzer, ErrorCategory
 
+# Markdown code fence around a model response; the body is group 1
+_FENCE_RE = re.compile(r'^```(?:python)?[ \t]*\n?(.*?)(?:```|\Z)', re.DOTALL)
+
+def _stat_key(path):
+    '''(mtime_ns, size) of a file; the size catches rewrites a coarse mtime misses.'''
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+@lru_cache(maxsize=64)
+def _read_script(script_path, stat_key):
+    '''Script source, cached until the file's mtime or size changes.'''
+    with open(script_path, 'r') as f:
+        return f.read()
+
+@lru_cache(maxsize=64)
+def _read_csv_head(data_path, stat_key):
+    '''Column names and dtypes of a CSV, cached until the file's mtime or size changes.'''
+    # Optional, and imported only when a CSV head is needed: pyarrow reads just
+    # the header and first block to get a schema
+    try:
+        import pyarrow.csv as pacsv
+    except ImportError:
+        pacsv = None
+    if pacsv is not None:
+        # The streaming reader infers the schema from the first block only
+        reader = pacsv.open_csv(data_path, read_options=pacsv.ReadOptions(block_size=65536))
+        try:
+            schema = reader.schema
+        finally:
+            reader.close()
+        data_types = {field.name: str(field.type) for field in schema}
+        return str(schema.names) + f"\nData Types: {data_types}"
+    import pandas as pd
+    df = pd.read_csv(data_path, nrows=2)
+    data_head = str(df.columns.tolist())
+    # Also get dtypes for type mismatch context
+    data_types = str(df.dtypes.to_dict())
+    return data_head + f"\nData Types: {data_types}"
+
 class RealLLM:
     def __init__(self, config):
         """Initialize LLM with configuration."""
         self.config = config
+        # Imported here so modules that only need ErrorAnalyzer skip the SDK
+        from openai import OpenAI
         self.client = OpenAI(
             api_key=config.ai.api_key,
             base_url=config.ai.base_url
@@ -57,10 +98,9 @@ TASK: Fix the code to handle the error. Return ONLY the corrected Python code, n
             fixed_code = response.choices[0].message.content.strip()
             
             # Remove markdown code blocks if present
-            if fixed_code.startswith('```python'):
-                fixed_code = fixed_code.split('```python')[1].split('```')[0].strip()
-            elif fixed_code.startswith('```'):
-                fixed_code = fixed_code.split('```')[1].split('```')[0].strip()
+            match = _FENCE_RE.match(fixed_code)
+            if match:
+                fixed_code = match.group(1).strip()
             
             print('✓ LLM: Fix generated successfully.')
             return fixed_code
@@ -103,16 +143,11 @@ class DataDoctor:
         diagnosis = self.analyzer.analyze(error_log)
         
         # 2. Read the broken code
-        with open(script_path, 'r') as f:
-            code_content = f.read()
+        code_content = _read_script(script_path, _stat_key(script_path))
             
         # 3. Read the data head to understand the new schema
         try:
-            df = pd.read_csv(data_path, nrows=2)
-            data_head = str(df.columns.tolist())
-            # Also get dtypes for type mismatch context
-            data_types = str(df.dtypes.to_dict())
-            data_head += f"\nData Types: {data_types}"
+            data_head = _read_csv_head(data_path, _stat_key(data_path))
         except Exception as e:
             data_head = f'Could not read data: {e}'
 
@@ -4,6 +4,46 @@ from enum import Enum
 from dataclasses import dataclass
 from typing import Optional, List, Dict, Any
 
+# Substrings analyze() branches on; all are located in one pass over the log
+_MARKERS = (
+    "DataValidationError",
+    "Data Validation Failed",
+    "null values",
+    "duplicate values",
+    "ModuleNotFoundError",
+    "ImportError",
+    "KeyError",
+    "TypeError",
+    "ValueError",
+    "could not convert",
+    "unexpected keyword",
+    "invalid literal",
+    "Schema Mismatch",
+    "SyntaxError",
+    "IndentationError",
+    "FileNotFoundError",
+    "ConnectionError",
+    "Timeout",
+    "401 Client Error",
+)
+
+try:
+    import ahocorasick
+
+    _AUTOMATON = ahocorasick.Automaton()
+    for _marker in _MARKERS:
+        _AUTOMATON.add_word(_marker, _marker)
+    _AUTOMATON.make_automaton()
+
+    def _find_markers(error_log: str) -> set:
+        return {marker for _, marker in _AUTOMATON.iter(error_log)}
+except ImportError:
+    # Zero-width lookahead so overlapping markers are all reported
+    _MARKER_RE = re.compile("(?=(" + "|".join(map(re.escape, _MARKERS)) + "))")
+
+    def _find_markers(error_log: str) -> set:
+        return {match.group(1) for match in _MARKER_RE.finditer(error_log)}
+
 class ErrorCategory(Enum):
     SCHEMA_DRIFT = "schema_drift"
     TYPE_MISMATCH = "type_mismatch"
@@ -29,6 +69,10 @@ class ErrorAnalyzer:
     and extract relevant context for the AI healer.
     """
     
+    _RE_NO_MODULE = re.compile(r"No module named '(\w+)'")
+    _RE_KEYERROR = re.compile(r"KeyError: '(\w+)'")
+    _RE_FILENOTFOUND = re.compile(r"No such file or directory: '(.+)'")
+    
     def analyze(self, error_log: str) -> ErrorDiagnosis:
         """
         Analyze the error log and return a structured diagnosis.
@@ -36,77 +80,89 @@ class ErrorAnalyzer:
         category = ErrorCategory.UNKNOWN
         context = {}
         strategy = "Analyze the code and error to find a fix."
+        hits = _find_markers(error_log)
         
-        # 0. Check for Data Validation Errors
-        if "DataValidationError" in error_log or "Data Validation Failed" in error_log:
-            category = ErrorCategory.DATA_QUALITY
-            strategy = "Data quality issues detected. Consider cleaning the data (e.g., dropping nulls/duplicates) or relaxing validation rules."
-            # Extract specific errors
-            if "null values" in error_log:
-                context['issue'] = "null_values"
-            elif "duplicate values" in error_log:
-                context['issue'] = "duplicates"
-
-        # 1. Check for Missing Dependencies
-        elif "ModuleNotFoundError" in error_log or "ImportError" in error_log:
-            category = ErrorCategory.MISSING_DEPENDENCY
-            match = re.search(r"No module named '(\w+)'", error_log)
-            if match:
-                context['missing_module'] = match.group(1)
-                strategy = f"Add '{match.group(1)}' to requirements.txt or install it."
-            else:
-                strategy = "Check imports and installed packages."
-
-        # 2. Check for Schema Drift (KeyError in pandas/dict)
-        elif "KeyError" in error_log:
-            category = ErrorCategory.SCHEMA_DRIFT
-            match = re.search(r"KeyError: '(\w+)'", error_log)
-            if match:
-                context['missing_column'] = match.group(1)
-                strategy = f"The column '{match.group(1)}' is missing from the data. Check for schema changes or renamed columns."
-            else:
-                strategy = "A required key or column is missing."
-                
-        # 3. Check for Type Mismatch
-        elif "TypeError" in error_log or "ValueError" in error_log:
-            # Heuristic: often happens during data processing or schema validation
-            if "could not convert" in error_log or "unexpected keyword" in error_log:
-                category = ErrorCategory.TYPE_MISMATCH
-                strategy = "Check data types and function arguments. Ensure data matches expected format."
-            elif "invalid literal" in error_log:
-                category = ErrorCategory.TYPE_MISMATCH
-                strategy = "Data contains non-numeric values in a numeric column. Use pd.to_numeric(..., errors='coerce') to handle them."
-            elif "Schema Mismatch" in error_log: # Custom error from our pipeline
-                category = ErrorCategory.SCHEMA_DRIFT
-                strategy = "The data schema does not match expectations. Update the code to handle the new schema."
-            else:
-                category = ErrorCategory.TYPE_MISMATCH
-                strategy = "Fix type incompatibility."
-
-        # 4. Check for Syntax Errors
-        elif "SyntaxError" in error_log or "IndentationError" in error_log:
-            category = ErrorCategory.SYNTAX_ERROR
-            strategy = "Fix Python syntax errors."
-
-        # 5. Check for File I/O Errors
-        elif "FileNotFoundError" in error_log:
-            category = ErrorCategory.FILE_IO
-            match = re.search(r"No such file or directory: '(.+)'", error_log)
-            if match:
-                context['missing_file'] = match.group(1)
-                strategy = f"Ensure the file '{match.group(1)}' exists or check the path."
-            else:
-                strategy = "Check file paths and permissions."
-
-        # 6. Check for API/Network Errors
-        elif "ConnectionError" in error_log or "Timeout" in error_log or "401 Client Error" in error_log:
-            category = ErrorCategory.API_ERROR
-            strategy = "Check network connection, API keys, and service status."
+        # First handler whose markers appear in the log wins
+        for markers, handler in self._HANDLERS:
+            if not hits.isdisjoint(markers):
+                category, strategy = handler(self, error_log, hits, context)
+                break
+
+        # Second-to-last line (the exception line when the log ends in a newline),
+        # found by slicing rather than splitting the whole log
+        last_newline = error_log.rfind('\n')
+        if last_newline == -1:
+            message = error_log
+        else:
+            message = error_log[error_log.rfind('\n', 0, last_newline) + 1:last_newline]
 
         return ErrorDiagnosis(
             category=category,
-            message=error_log.split('\n')[-2] if len(error_log.split('\n')) > 1 else error_log,
+            message=message,
             context=context,
             original_error=error_log,
             suggested_fix_strategy=strategy
         )
+
+    # 0. Data Validation Errors
+    def _handle_data_quality(self, error_log, hits, context):
+        # Extract specific errors
+        if "null values" in hits:
+            context['issue'] = "null_values"
+        elif "duplicate values" in hits:
+            context['issue'] = "duplicates"
+        return ErrorCategory.DATA_QUALITY, "Data quality issues detected. Consider cleaning the data (e.g., dropping nulls/duplicates) or relaxing validation rules."
+
+    # 1. Missing Dependencies
+    def _handle_missing_dependency(self, error_log, hits, context):
+        match = self._RE_NO_MODULE.search(error_log)
+        if match:
+            context['missing_module'] = match.group(1)
+            return ErrorCategory.MISSING_DEPENDENCY, f"Add '{match.group(1)}' to requirements.txt or install it."
+        return ErrorCategory.MISSING_DEPENDENCY, "Check imports and installed packages."
+
+    # 2. Schema Drift (KeyError in pandas/dict)
+    def _handle_schema_drift(self, error_log, hits, context):
+        match = self._RE_KEYERROR.search(error_log)
+        if match:
+            context['missing_column'] = match.group(1)
+            return ErrorCategory.SCHEMA_DRIFT, f"The column '{match.group(1)}' is missing from the data. Check for schema changes or renamed columns."
+        return ErrorCategory.SCHEMA_DRIFT, "A required key or column is missing."
+
+    # 3. Type Mismatch
+    def _handle_type_mismatch(self, error_log, hits, context):
+        # Heuristic: often happens during data processing or schema validation
+        if "could not convert" in hits or "unexpected keyword" in hits:
+            return ErrorCategory.TYPE_MISMATCH, "Check data types and function arguments. Ensure data matches expected format."
+        if "invalid literal" in hits:
+            return ErrorCategory.TYPE_MISMATCH, "Data contains non-numeric values in a numeric column. Use pd.to_numeric(..., errors='coerce') to handle them."
+        if "Schema Mismatch" in hits: # Custom error from our pipeline
+            return ErrorCategory.SCHEMA_DRIFT, "The data schema does not match expectations. Update the code to handle the new schema."
+        return ErrorCategory.TYPE_MISMATCH, "Fix type incompatibility."
+
+    # 4. Syntax Errors
+    def _handle_syntax_error(self, error_log, hits, context):
+        return ErrorCategory.SYNTAX_ERROR, "Fix Python syntax errors."
+
+    # 5. File I/O Errors
+    def _handle_file_io(self, error_log, hits, context):
+        match = self._RE_FILENOTFOUND.search(error_log)
+        if match:
+            context['missing_file'] = match.group(1)
+            return ErrorCategory.FILE_IO, f"Ensure the file '{match.group(1)}' exists or check the path."
+        return ErrorCategory.FILE_IO, "Check file paths and permissions."
+
+    # 6. API/Network Errors
+    def _handle_api_error(self, error_log, hits, context):
+        return ErrorCategory.API_ERROR, "Check network connection, API keys, and service status."
+
+    # Checked in order: (markers, handler)
+    _HANDLERS = (
+        (frozenset({"DataValidationError", "Data Validation Failed"}), _handle_data_quality),
+        (frozenset({"ModuleNotFoundError", "ImportError"}), _handle_missing_dependency),
+        (frozenset({"KeyError"}), _handle_schema_drift),
+        (frozenset({"TypeError", "ValueError"}), _handle_type_mismatch),
+        (frozenset({"SyntaxError", "IndentationError"}), _handle_syntax_error),
+        (frozenset({"FileNotFoundError"}), _handle_file_io),
+        (frozenset({"ConnectionError", "Timeout", "401 Client Error"}), _handle_api_error),
+    )
@@ -5,21 +5,28 @@ from typing import Optional
 
 class MetricsManager:
     _instance = None
+    _initialized = False
     _lock = threading.Lock()
 
     def __new__(cls):
-        with cls._lock:
-            if cls._instance is None:
-                cls._instance = super(MetricsManager, cls).__new__(cls)
-                cls._instance._initialized = False
+        # Double-checked: the lock is only taken until the instance exists
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super(MetricsManager, cls).__new__(cls)
         return cls._instance
 
     def __init__(self):
-        if self._initialized:
+        if MetricsManager._initialized:
             return
-            
-        self._initialized = True
-        
+        with MetricsManager._lock:
+            if MetricsManager._initialized:
+                return
+            self._setup()
+            # Set last, so no caller sees a half-initialized instance
+            MetricsManager._initialized = True
+
+    def _setup(self):
         # Define Metrics
         self.pipeline_runs = Counter(
             'shp_pipeline_runs_total', 
@@ -55,6 +62,19 @@ class MetricsManager:
             'Timestamp of the last pipeline run'
         )
 
+        # Bound once here instead of looked up on every event
+        self._observe_duration = self.pipeline_duration.observe
+        self._set_last_run = self.last_run_timestamp.set
+        self._inc_cost = self.ai_cost.inc
+
+        # Label-bound children, so recording an event is a dict lookup plus inc()
+        self._run_children = {status: self.pipeline_runs.labels(status=status) for status in ('success', 'failure')}
+        self._healing_children = {status: self.healing_attempts.labels(status=status) for status in ('success', 'failure')}
+        self._error_children = {
+            error_type: self.pipeline_errors.labels(type=error_type)
+            for error_type in ('schema_drift', 'type_mismatch', 'data_validation_error', 'unknown')
+        }
+
         # Start Prometheus HTTP Server
         try:
             start_http_server(8000)
@@ -63,15 +83,25 @@ class MetricsManager:
             print("⚠ Metrics server port 8000 likely already in use. Skipping start.")
 
     def record_pipeline_run(self, status: str, duration: float):
-        self.pipeline_runs.labels(status=status).inc()
-        self.pipeline_duration.observe(duration)
-        self.last_run_timestamp.set(time.time())
+        child = self._run_children.get(status)
+        if child is None:
+            child = self._run_children[status] = self.pipeline_runs.labels(status=status)
+        child.inc()
+        self._observe_duration(duration)
+        self._set_last_run(time.time())
 
     def record_error(self, error_type: str):
-        self.pipeline_errors.labels(type=error_type).inc()
+        # Error types are open-ended (exception class names), so cache new ones
+        child = self._error_children.get(error_type)
+        if child is None:
+            child = self._error_children[error_type] = self.pipeline_errors.labels(type=error_type)
+        child.inc()
 
     def record_healing(self, status: str):
-        self.healing_attempts.labels(status=status).inc()
+        child = self._healing_children.get(status)
+        if child is None:
+            child = self._healing_children[status] = self.healing_attempts.labels(status=status)
+        child.inc()
 
     def record_cost(self, amount: float):
-        self.ai_cost.inc(amount)
+        self._inc_cost(amount)
@@ -1,21 +1,111 @@
 import json
 import time
+import atexit
+import logging
+import weakref
 from datetime import datetime
 import os
-import requests
 from src.metrics import MetricsManager
 from src.alert_manager import AlertManager
 
+logger = logging.getLogger(__name__)
+
+# Buffered history lines are flushed at least this often (seconds)
+FLUSH_INTERVAL = 1.0
+# The dashboard is re-rendered at most this often while events arrive (seconds)
+DASHBOARD_INTERVAL = 2.0
+
+# Dashboard template pieces, built once; the page is assembled with one join
+_DASHBOARD_HEADER = """
+        <html>
+        <head>
+            <title>Pipeline Health Dashboard</title>
+            <style>
+                body {{ font-family: Arial, sans-serif; margin: 20px; }}
+                .card {{ border: 1px solid #ccc; padding: 15px; margin-bottom: 10px; border-radius: 5px; }}
+                .success {{ background-color: #d4edda; border-color: #c3e6cb; }}
+                .error {{ background-color: #f8d7da; border-color: #f5c6cb; }}
+                h1 {{ color: #333; }}
+            </style>
+        </head>
+        <body>
+            <h1>Self-Healing Pipeline Dashboard</h1>
+            <p>Last Updated: {updated}</p>
+            <p><a href="http://localhost:8000/metrics">Prometheus Metrics</a></p>
+            <hr>
+            <h2>Recent Events</h2>
+        """
+_DASHBOARD_ROW = """
+            <div class="card {color_class}">
+                <strong>{timestamp}</strong> - {type}<br>
+                <pre>{text}</pre>
+            </div>
+            """
+_DASHBOARD_FOOTER = "</body></html>"
+
+# Monitors whose log is still open; one atexit hook closes them all without
+# keeping discarded instances alive
+_open_monitors: "weakref.WeakSet[MonitoringSystem]" = weakref.WeakSet()
+
+@atexit.register
+def _close_open_monitors():
+    for monitor in list(_open_monitors):
+        monitor.close()
+
+def _read_history(metrics_file):
+    """
+    Load the events in the JSON-lines log. Undecodable lines are skipped; if
+    they end the file (a write cut short by a crash or kill), they are also
+    truncated away so the next event starts on a line of its own.
+    Raises FileNotFoundError if the log does not exist yet.
+    """
+    history = []
+    offset = 0
+    torn_at = None  # Start of the undecodable lines at the end of the file, if any
+    with open(metrics_file, 'rb') as f:
+        for number, line in enumerate(f, 1):
+            if line.strip():
+                try:
+                    history.append(json.loads(line))
+                    torn_at = None
+                except ValueError:
+                    logger.warning("Skipping undecodable line %d of %s", number, metrics_file)
+                    if torn_at is None:
+                        torn_at = offset
+            offset += len(line)
+    if torn_at is not None:
+        logger.warning("Truncating incomplete last line of %s", metrics_file)
+        os.truncate(metrics_file, torn_at)
+    return history
+
+def _import_legacy_history(metrics_file):
+    """
+    Convert the metrics.json array written by earlier versions, next to
+    metrics_file, into JSON lines. Returns the imported events, or None when
+    there is nothing to import. The old file is left in place.
+    """
+    legacy_file = os.path.join(os.path.dirname(metrics_file), 'metrics.json')
+    try:
+        with open(legacy_file, 'r') as f:
+            history = json.load(f)
+    except FileNotFoundError:
+        return None
+    tmp_path = f'{metrics_file}.tmp'
+    with open(tmp_path, 'w') as f:
+        f.writelines(json.dumps(event) + '\n' for event in history)
+    os.replace(tmp_path, metrics_file)
+    return history
+
 class MonitoringSystem:
     def __init__(self, config=None):
         self.config = config
         # Use config for paths if available, else defaults
         if config:
-            self.metrics_file = config.monitoring.metrics_path
-            self.dashboard_file = config.monitoring.dashboard_path
+            self.metrics_file = str(config.get_absolute_path(config.paths.logs_dir) / 'metrics.jsonl')
+            self.dashboard_file = str(config.get_absolute_path(config.paths.dashboard_dir) / 'index.html')
             self.alert_manager = AlertManager(config)
         else:
-            self.metrics_file = r'E:\self_healing_pipeline\logs\metrics.json'
+            self.metrics_file = r'E:\self_healing_pipeline\logs\metrics.jsonl'
             self.dashboard_file = r'E:\self_healing_pipeline\logs\dashboard.html'
             # Dummy alert manager if no config
             from src.config_schema import Config
@@ -26,12 +116,20 @@ class MonitoringSystem:
         # Ensure directory exists
         os.makedirs(os.path.dirname(self.metrics_file), exist_ok=True)
         
-        # Load existing history
-        if os.path.exists(self.metrics_file):
-            with open(self.metrics_file, 'r') as f:
-                self.history = json.load(f)
-        else:
-            self.history = []
+        # Load existing history (one JSON object per line)
+        try:
+            self.history = _read_history(self.metrics_file)
+        except FileNotFoundError:
+            # First run on the JSON-lines log: carry over the old history
+            self.history = _import_legacy_history(self.metrics_file) or []
+        
+        # Events are appended, never rewritten; the buffer is flushed on a timer
+        # and at shutdown, when the dashboard is also rendered
+        self._fp = open(self.metrics_file, 'ab', buffering=64 * 1024)
+        self._last_flush = time.monotonic()
+        self._last_dashboard = 0.0
+        self._dashboard_dirty = False
+        _open_monitors.add(self)
 
     def log_error(self, error_msg):
         """Log an error occurrence."""
@@ -72,42 +170,54 @@ class MonitoringSystem:
             self.alert_manager.send_alert("Healing Failed", "AI attempted to fix the pipeline but failed.", level="error")
 
     def _save(self):
-        with open(self.metrics_file, 'w') as f:
-            json.dump(self.history, f, indent=2)
-        self.generate_dashboard()
+        """Append the newest event to the history log and refresh the dashboard if it is due."""
+        self._fp.write(json.dumps(self.history[-1]).encode('utf-8') + b'\n')
+        now = time.monotonic()
+        if now - self._last_flush >= FLUSH_INTERVAL:
+            self._fp.flush()
+            self._last_flush = now
+
+        # Bursts of events render once; close() picks up whatever is left over
+        if now - self._last_dashboard > DASHBOARD_INTERVAL:
+            self.generate_dashboard()
+            self._last_dashboard = now
+            self._dashboard_dirty = False
+        else:
+            self._dashboard_dirty = True
+
+    def close(self):
+        """
+        Flush buffered events, render any pending dashboard update, close the
+        history log and wait for queued alerts to be delivered.
+        """
+        if self._fp.closed:
+            return
+        self._fp.close()
+        _open_monitors.discard(self)
+        if self._dashboard_dirty:
+            self.generate_dashboard()
+            self._dashboard_dirty = False
+        # The last alert is usually the final failure; do not lose it at exit
+        self.alert_manager.flush()
 
     def generate_dashboard(self):
         """Generate a simple HTML dashboard."""
-        html = f"""
-        <html>
-        <head>
-            <title>Pipeline Health Dashboard</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 20px; }}
-                .card {{ border: 1px solid #ccc; padding: 15px; margin-bottom: 10px; border-radius: 5px; }}
-                .success {{ background-color: #d4edda; border-color: #c3e6cb; }}
-                .error {{ background-color: #f8d7da; border-color: #f5c6cb; }}
-                h1 {{ color: #333; }}
-            </style>
-        </head>
-        <body>
-            <h1>Self-Healing Pipeline Dashboard</h1>
-            <p>Last Updated: {datetime.now()}</p>
-            <p><a href="http://localhost:8000/metrics">Prometheus Metrics</a></p>
-            <hr>
-            <h2>Recent Events</h2>
-        """
-        
+        parts = [_DASHBOARD_HEADER.format(updated=datetime.now())]
         for event in reversed(self.history[-10:]):
             color_class = 'success' if event.get('success', False) or event['type'] == 'INFO' else 'error'
-            html += f"""
-            <div class="card {color_class}">
-                <strong>{event['timestamp']}</strong> - {event['type']}<br>
-                <pre>{event.get('message') or event.get('error')}</pre>
-            </div>
-            """
-            
-        html += "</body></html>"
+            parts.append(_DASHBOARD_ROW.format(
+                color_class=color_class,
+                timestamp=event['timestamp'],
+                type=event['type'],
+                text=event.get('message') or event.get('error')
+            ))
+        parts.append(_DASHBOARD_FOOTER)
+        html = ''.join(parts)
         
-        with open(self.dashboard_file, 'w') as f:
+        os.makedirs(os.path.dirname(self.dashboard_file), exist_ok=True)
+        # Write a sibling and swap it in, so a reader never sees a half-written page
+        tmp_path = f'{self.dashboard_file}.tmp'
+        with open(tmp_path, 'w') as f:
             f.write(html)
+        os.replace(tmp_path, self.dashboard_file)
+        return self.dashboard_file
@@ -6,7 +6,8 @@ from datetime import datetime
 class RollbackManager:
     def __init__(self, backup_dir='E:\\self_healing_pipeline\\logs\\backups'):
         self.backup_dir = backup_dir
-        self.version_history_file = 'E:\\self_healing_pipeline\\logs\\version_history.json'
+        self.version_history_file = 'E:\\self_healing_pipeline\\logs\\version_history.jsonl'
+        self._history_fp = None
         os.makedirs(self.backup_dir, exist_ok=True)
         
     def create_backup(self, file_path):
@@ -25,14 +26,19 @@ class RollbackManager:
     def rollback(self, file_path, backup_path=None):
         '''Rollback to the most recent backup or a specific backup.'''
         if backup_path is None:
-            # Find the most recent backup
-            filename = os.path.basename(file_path)
-            backups = [f for f in os.listdir(self.backup_dir) if f.startswith(filename)]
-            if not backups:
+            # Find the most recent backup: the timestamp in the name sorts
+            # chronologically, so keep a running max instead of sorting
+            prefix = os.path.basename(file_path) + '.'
+            latest = None
+            with os.scandir(self.backup_dir) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if name.startswith(prefix) and name.endswith('.bak') and (latest is None or name > latest.name):
+                        latest = entry
+            if latest is None:
                 print(' No backups found for rollback.')
                 return False
-            backups.sort(reverse=True)
-            backup_path = os.path.join(self.backup_dir, backups[0])
+            backup_path = latest.path
         
         shutil.copy2(backup_path, file_path)
         print(f' Rolled back to: {backup_path}')
@@ -40,21 +46,59 @@ class RollbackManager:
         return True
     
     def _log_version(self, file_path, backup_path, action):
-        '''Log version changes to JSON file.'''
-        history = []
-        if os.path.exists(self.version_history_file):
-            with open(self.version_history_file, 'r') as f:
-                history = json.load(f)
-        
-        history.append({
+        '''Append a version change to the JSON-lines history.'''
+        entry = {
             'timestamp': datetime.now().isoformat(),
             'file': file_path,
             'backup': backup_path,
             'action': action
-        })
-        
-        with open(self.version_history_file, 'w') as f:
+        }
+        if self._history_fp is None or self._history_fp.name != self.version_history_file:
+            if self._history_fp is not None:
+                self._history_fp.close()
+            if not os.path.exists(self.version_history_file):
+                self._import_legacy_history()
+            # Line-buffered: each record reaches the file with a single write
+            self._history_fp = open(self.version_history_file, 'a', buffering=1)
+        self._history_fp.write(json.dumps(entry) + '\n')
+
+    def _import_legacy_history(self):
+        '''Convert the version_history.json array from earlier versions into the JSON-lines log.'''
+        legacy_file = os.path.join(os.path.dirname(self.version_history_file), 'version_history.json')
+        try:
+            with open(legacy_file, 'r') as f:
+                history = json.load(f)
+        except FileNotFoundError:
+            return
+        tmp_path = f'{self.version_history_file}.tmp'
+        with open(tmp_path, 'w') as f:
+            f.writelines(json.dumps(entry) + '\n' for entry in history)
+        os.replace(tmp_path, self.version_history_file)
+
+    def close(self):
+        '''Close the history log; the next logged change reopens it.'''
+        if self._history_fp is not None:
+            self._history_fp.close()
+            self._history_fp = None
+
+    def compact_history(self, output_path=None):
+        '''
+        Rewrite the JSON-lines history as a single JSON array for consumers that
+        need one. The default output name differs from the legacy
+        version_history.json, so the old history is never overwritten.
+        '''
+        if output_path is None:
+            output_path = os.path.splitext(self.version_history_file)[0] + '.compacted.json'
+        history = []
+        if os.path.exists(self.version_history_file):
+            with open(self.version_history_file, 'r') as f:
+                history = [json.loads(line) for line in f if line.strip()]
+
+        tmp_path = f'{output_path}.tmp'
+        with open(tmp_path, 'w') as f:
             json.dump(history, f, indent=2)
+        os.replace(tmp_path, output_path)
+        return output_path
 
 if __name__ == '__main__':
     # Test
@@ -1,7 +1,19 @@
 from abc import ABC, abstractmethod
+# Imported eagerly on purpose: rules are only loaded by code that already holds
+# a DataFrame, and _TYPE_CHECKS and _kernels need both at import time
+import numpy as np
 import pandas as pd
 import re
+from numbers import Real
 from typing import Any, Optional
+from src import _kernels
+
+# expected_type -> dtype predicate; types without an entry are not checked
+_TYPE_CHECKS = {
+    int: pd.api.types.is_integer_dtype,
+    float: pd.api.types.is_float_dtype,
+    str: lambda dtype: pd.api.types.is_string_dtype(dtype) or pd.api.types.is_object_dtype(dtype),
+}
 
 class ValidationResult:
     def __init__(self, success: bool, message: Optional[str] = None):
@@ -16,12 +28,41 @@ class ValidationRule(ABC):
     def check(self, df: pd.DataFrame) -> ValidationResult:
         pass
 
+    def key(self) -> tuple:
+        """Stable identity of this rule's configuration, used to tie recorded passes to the rule set."""
+        return (type(self).__name__, self.column)
+
+    def check_array(self, values: np.ndarray, null_mask: np.ndarray) -> Optional[ValidationResult]:
+        """
+        Fast path used by Validator: check the column's values directly, reusing
+        a null mask shared by every rule on the column. Returns None if the rule
+        has no array implementation and needs check(df) instead.
+        """
+        return None
+
 class NotNullRule(ValidationRule):
     def check(self, df: pd.DataFrame) -> ValidationResult:
         if self.column not in df.columns:
             return ValidationResult(False, f"Column '{self.column}' missing from DataFrame")
         
-        null_count = df[self.column].isnull().sum()
+        series = df[self.column]
+        if series.dtype == np.float64:
+            null_count = _kernels.count_nans_f64(series.to_numpy())
+        else:
+            null_mask = series.isnull()
+            # Clean columns (the common case) only need the cheaper any(); count on failure
+            if not null_mask.any():
+                return ValidationResult(True)
+            null_count = null_mask.sum()
+        return self.result_for_count(null_count)
+
+    def check_array(self, values: np.ndarray, null_mask: np.ndarray) -> Optional[ValidationResult]:
+        if not null_mask.any():
+            return ValidationResult(True)
+        return self.result_for_count(int(null_mask.sum()))
+
+    def result_for_count(self, null_count: int) -> ValidationResult:
+        """Result for a column with null_count nulls, however they were counted."""
         if null_count > 0:
             return ValidationResult(False, f"Column '{self.column}' contains {null_count} null values")
         return ValidationResult(True)
@@ -30,9 +71,31 @@ class UniqueRule(ValidationRule):
     def check(self, df: pd.DataFrame) -> ValidationResult:
         if self.column not in df.columns:
             return ValidationResult(False, f"Column '{self.column}' missing from DataFrame")
+        
+        series = df[self.column]
+        if series.dtype == np.int64:
+            # Integer ids have no nulls; count them with the array kernel
+            return self.result_for_count(_kernels.count_duplicates_i64(series.to_numpy()))
             
-        if not df[self.column].is_unique:
-            duplicates = df[self.column].duplicated().sum()
+        # A single hash pass (O(n), one hash table) answers both "unique?" and "how many duplicates?"
+        duplicated = series.duplicated()
+        if not duplicated.any():
+            return ValidationResult(True)
+        return self.result_for_count(int(duplicated.sum()))
+
+    def check_array(self, values: np.ndarray, null_mask: np.ndarray) -> Optional[ValidationResult]:
+        if values.dtype == np.int64:
+            duplicates = _kernels.count_duplicates_i64(values)
+        else:
+            # One hash pass: every value beyond the first of its kind is a duplicate
+            # (nulls compare equal, matching Series.duplicated)
+            _, uniques = pd.factorize(values, use_na_sentinel=False)
+            duplicates = len(values) - len(uniques)
+        return self.result_for_count(duplicates)
+
+    def result_for_count(self, duplicates: int) -> ValidationResult:
+        """Result for a column with this many duplicate values."""
+        if duplicates:
             return ValidationResult(False, f"Column '{self.column}' contains {duplicates} duplicate values")
         return ValidationResult(True)
 
@@ -41,30 +104,18 @@ class TypeRule(ValidationRule):
         super().__init__(column)
         self.expected_type = expected_type
 
+    def key(self) -> tuple:
+        return (type(self).__name__, self.column, self.expected_type.__name__)
+
     def check(self, df: pd.DataFrame) -> ValidationResult:
         if self.column not in df.columns:
             return ValidationResult(False, f"Column '{self.column}' missing from DataFrame")
             
-        # Check if all non-null values match the expected type
-        # This is a bit tricky in pandas as columns often have mixed types (object)
-        # We'll check a sample or try conversion?
-        # Better: check dtypes or apply isinstance
-        
-        # Simple check: if expected is int, check if pandas dtype is int64 or similar
-        # If expected is str, check if object or string
-        
         dtype = df[self.column].dtype
-        
-        if self.expected_type == int:
-            if not pd.api.types.is_integer_dtype(dtype):
-                 return ValidationResult(False, f"Column '{self.column}' expected int, got {dtype}")
-        elif self.expected_type == float:
-            if not pd.api.types.is_float_dtype(dtype):
-                 return ValidationResult(False, f"Column '{self.column}' expected float, got {dtype}")
-        elif self.expected_type == str:
-            if not pd.api.types.is_string_dtype(dtype) and not pd.api.types.is_object_dtype(dtype):
-                 return ValidationResult(False, f"Column '{self.column}' expected str, got {dtype}")
-                 
+        is_expected = _TYPE_CHECKS.get(self.expected_type)
+        if is_expected is not None and not is_expected(dtype):
+            return ValidationResult(False, f"Column '{self.column}' expected {self.expected_type.__name__}, got {dtype}")
+
         return ValidationResult(True)
 
 class RangeRule(ValidationRule):
@@ -73,18 +124,56 @@ class RangeRule(ValidationRule):
         self.min_val = min_val
         self.max_val = max_val
 
+    def key(self) -> tuple:
+        return (type(self).__name__, self.column, repr(self.min_val), repr(self.max_val))
+
+    def _numeric_bounds(self) -> bool:
+        """True if both bounds are unset or plain real numbers."""
+        return all(
+            bound is None or (isinstance(bound, Real) and not isinstance(bound, bool))
+            for bound in (self.min_val, self.max_val)
+        )
+
+    def float_bounds(self) -> tuple:
+        """(lo, hi) as floats for the array kernels, unset bounds being infinite."""
+        lo = -np.inf if self.min_val is None else float(self.min_val)
+        hi = np.inf if self.max_val is None else float(self.max_val)
+        return lo, hi
+
     def check(self, df: pd.DataFrame) -> ValidationResult:
         if self.column not in df.columns:
             return ValidationResult(False, f"Column '{self.column}' missing from DataFrame")
-            
+
+        # Compare on the underlying array rather than building boolean Series
+        values = df[self.column].to_numpy()
+        return self.check_array(values, pd.isna(values))
+
+    def _check_numeric(self, values: np.ndarray) -> ValidationResult:
+        # Both bounds in one pass; NaN fails both comparisons
+        below, above = _kernels.count_out_of_range_f64(values, *self.float_bounds())
+        return self.result_for_counts(below, above)
+
+    def result_for_counts(self, below: int, above: int) -> ValidationResult:
+        """Result for a column with below/above values outside the bounds."""
+        if below:
+            return ValidationResult(False, f"Column '{self.column}' has {below} values < {self.min_val}")
+        if above:
+            return ValidationResult(False, f"Column '{self.column}' has {above} values > {self.max_val}")
+        return ValidationResult(True)
+
+    def check_array(self, values: np.ndarray, null_mask: np.ndarray) -> Optional[ValidationResult]:
+        if values.dtype in (np.float64, np.int64) and self._numeric_bounds():
+            return self._check_numeric(values)
+        
+        # Nulls never fail a bound, as with Series comparisons
+        present = values[~null_mask] if null_mask.any() else values
+        # Each comparison is evaluated once; its mask is only counted if it has hits
         if self.min_val is not None:
-            if (df[self.column] < self.min_val).any():
-                count = (df[self.column] < self.min_val).sum()
-                return ValidationResult(False, f"Column '{self.column}' has {count} values < {self.min_val}")
-                
+            below = np.less(present, self.min_val)
+            if below.any():
+                return ValidationResult(False, f"Column '{self.column}' has {int(below.sum())} values < {self.min_val}")
         if self.max_val is not None:
-            if (df[self.column] > self.max_val).any():
-                count = (df[self.column] > self.max_val).sum()
-                return ValidationResult(False, f"Column '{self.column}' has {count} values > {self.max_val}")
-                
+            above = np.greater(present, self.max_val)
+            if above.any():
+                return ValidationResult(False, f"Column '{self.column}' has {int(above.sum())} values > {self.max_val}")
         return ValidationResult(True)
@@ -0,0 +1,82 @@
+import os
+
+import pytest
+import yaml
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "slow: error-path tests; deselect with -m 'not slow' for a quick local run"
+    )
+    config.addinivalue_line(
+        "markers", "perf: validation on a million-row frame; deselected unless RUN_PERF_TESTS=1"
+    )
+    # CI must run against libyaml; the pure-Python fallback is an order of magnitude slower
+    if os.getenv('CI'):
+        assert yaml.__with_libyaml__, "PyYAML was built without libyaml (CSafeLoader/CSafeDumper unavailable)"
+
+
+def pytest_collection_modifyitems(config, items):
+    # Perf tests build a million-row frame; opt in with RUN_PERF_TESTS=1
+    if os.getenv('RUN_PERF_TESTS') == '1':
+        return
+    deselected = [item for item in items if item.get_closest_marker("perf")]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = [item for item in items if not item.get_closest_marker("perf")]
+
+
+@pytest.fixture(scope="session")
+def ai_config():
+    """Config for healing tests; integration tests skip unless a real key is set."""
+    from src.config_schema import Config, AIConfig, PerformanceConfig
+
+    return Config(
+        ai=AIConfig(
+            api_key=os.getenv('SHP_AI_API_KEY', 'dummy_key'),
+            model='openai/gpt-4o-mini'
+        ),
+        # No background API request from every doctor built in tests
+        performance=PerformanceConfig(prewarm_connection=False)
+    )
+
+
+@pytest.fixture(scope="session")
+def doctor(ai_config):
+    """One DataDoctor (and its LLM client) shared by the whole session."""
+    from src.doctor import DataDoctor
+
+    return DataDoctor(config=ai_config)
+
+
+@pytest.fixture(scope="session")
+def analyzer():
+    from src.error_analyzer import ErrorAnalyzer
+
+    return ErrorAnalyzer()
+
+
+@pytest.fixture(scope="session")
+def dummy_csv(tmp_path_factory):
+    """Read-only placeholder CSV for tests whose script never reads its data."""
+    path = tmp_path_factory.mktemp("data") / "dummy.csv"
+    path.write_text("col1\n1")
+    return path
+
+
+@pytest.fixture(scope="session")
+def large_validation_df():
+    """Million-row users frame; about 0.1% of rows have a null age or a duplicated id."""
+    import numpy as np
+    import pandas as pd
+
+    n = 1_000_000
+    rng = np.random.default_rng(0)
+    ids = rng.permutation(n).astype(np.int64)
+    age = rng.normal(25, 5, n)
+    age[rng.random(n) < 0.001] = np.nan
+    # Each poisoned id repeats the id of the first row
+    dupes = rng.random(n) < 0.001
+    dupes[0] = False
+    ids[dupes] = ids[0]
+    return pd.DataFrame({'id': ids, 'age': age})
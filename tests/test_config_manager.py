@@ -3,14 +3,73 @@ Comprehensive unit tests for ConfigManager.
 Tests cover YAML loading, environment overrides, validation, and edge cases.
 """
 import pytest
+import io
+import json
 import os
 import yaml
+import shutil
 import tempfile
+from functools import lru_cache
 from pathlib import Path
 from src.config_manager import ConfigManager
 from src.config_schema import Config
 from pydantic import ValidationError
 
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeDumper
+
+
+def _freeze(value):
+    """Hashable form of a config dict, so identical test configs share one dump."""
+    if isinstance(value, dict):
+        return ('dict', tuple(sorted((key, _freeze(item)) for key, item in value.items())))
+    if isinstance(value, list):
+        return ('list', tuple(_freeze(item) for item in value))
+    return ('value', value)
+
+
+def _thaw(frozen):
+    kind, value = frozen
+    if kind == 'dict':
+        return {key: _thaw(item) for key, item in value}
+    if kind == 'list':
+        return [_thaw(item) for item in value]
+    return value
+
+
+@lru_cache(maxsize=None)
+def _dump_yaml(frozen) -> bytes:
+    """Serialize a frozen config once; the emitter is the slowest part of these tests."""
+    return yaml.dump(_thaw(frozen), Dumper=SafeDumper, allow_unicode=True).encode('utf-8')
+
+
+def _write_yaml(path, data):
+    path.write_bytes(_dump_yaml(_freeze(data)))
+
+
+@pytest.fixture(scope="session")
+def basic_config_file(tmp_path_factory):
+    """Minimal valid config, written once per session for tests that only read it."""
+    config_file = tmp_path_factory.mktemp("cfg") / "config.yaml"
+    _write_yaml(config_file, {'ai': {'api_key': 'test-key'}})
+    return config_file
+
+
+@pytest.fixture
+def basic_config_copy(basic_config_file, tmp_path):
+    """Private copy of the minimal config, for tests that write next to it."""
+    return Path(shutil.copy(basic_config_file, tmp_path / "config.yaml"))
+
+
+@pytest.fixture(scope="module")
+def bool_config_file(tmp_path_factory):
+    """Config with one healing flag off and one on, for boolean override cases."""
+    config_file = tmp_path_factory.mktemp("cfg_bool") / "config.yaml"
+    config_file.write_text("ai:\n  api_key: test-key\nhealing:\n  enable_rollback: false\n  enable_backup: true\n")
+    return config_file
+
 
 class TestConfigManager:
     """Test suite for ConfigManager functionality."""
@@ -20,12 +79,8 @@ class TestConfigManager:
         ConfigManager.reset()
     
     def teardown_method(self):
-        """Clean up after each test."""
+        """Clean up after each test; monkeypatch restores environment variables."""
         ConfigManager.reset()
-        # Clean up environment variables
-        for key in list(os.environ.keys()):
-            if key.startswith('SHP_'):
-                del os.environ[key]
     
     def test_load_basic_config(self, tmp_path):
         """Test loading a basic valid configuration."""
@@ -46,10 +101,9 @@ class TestConfigManager:
         }
         
         config_file = tmp_path / "config.yaml"
-        with open(config_file, 'w') as f:
-            yaml.dump(config_data, f)
+        _write_yaml(config_file, config_data)
         
-        manager = ConfigManager()
+        manager = ConfigManager._new_for_testing()
         config = manager.load_config(str(config_file), load_env_file=False)
         
         assert config.ai.api_key == 'test-key-123'
@@ -57,23 +111,16 @@ class TestConfigManager:
         assert config.healing.max_attempts == 3
         assert config.environment.env == 'development'
     
-    def test_load_config_with_env_override(self, tmp_path):
+    def test_load_config_with_env_override(self, monkeypatch):
         """Test that environment variables override config file values."""
-        config_data = {
-            'ai': {'api_key': 'file-key', 'temperature': 0.5},
-            'healing': {'max_attempts': 3}
-        }
-        
-        config_file = tmp_path / "config.yaml"
-        with open(config_file, 'w') as f:
-            yaml.dump(config_data, f)
+        source = io.StringIO("ai:\n  api_key: file-key\n  temperature: 0.5\nhealing:\n  max_attempts: 3\n")
         
         # Set environment overrides
-        os.environ['SHP_AI__API_KEY'] = 'env-key-override'
-        os.environ['SHP_HEALING__MAX_ATTEMPTS'] = '5'
+        monkeypatch.setenv('SHP_AI__API_KEY', 'env-key-override')
+        monkeypatch.setenv('SHP_HEALING__MAX_ATTEMPTS', '5')
         
-        manager = ConfigManager()
-        config = manager.load_config(str(config_file), load_env_file=False)
+        manager = ConfigManager._new_for_testing()
+        config = manager.load_config(source, load_env_file=False)
         
         assert config.ai.api_key == 'env-key-override'
         assert config.healing.max_attempts == 5
@@ -93,12 +140,10 @@ class TestConfigManager:
         base_file = tmp_path / "config.yaml"
         dev_file = tmp_path / "config.development.yaml"
         
-        with open(base_file, 'w') as f:
-            yaml.dump(base_config, f)
-        with open(dev_file, 'w') as f:
-            yaml.dump(dev_config, f)
+        _write_yaml(base_file, base_config)
+        _write_yaml(dev_file, dev_config)
         
-        manager = ConfigManager()
+        manager = ConfigManager._new_for_testing()
         config = manager.load_config(str(base_file), env='development', load_env_file=False)
         
         assert config.ai.api_key == 'base-key'  # From base
@@ -106,69 +151,85 @@ class TestConfigManager:
         assert config.ai.temperature == 0.5  # Overridden by dev
         assert config.healing.max_attempts == 2  # Overridden by dev
     
+    @pytest.mark.slow
     def test_missing_config_file(self):
         """Test error handling when config file doesn't exist."""
-        manager = ConfigManager()
+        manager = ConfigManager._new_for_testing()
         
         with pytest.raises(FileNotFoundError):
             manager.load_config('/nonexistent/config.yaml', load_env_file=False)
     
+    @pytest.mark.slow
     def test_invalid_yaml(self, tmp_path):
         """Test error handling for malformed YAML."""
         config_file = tmp_path / "config.yaml"
         with open(config_file, 'w') as f:
             f.write("invalid: yaml: content:\n  - broken")
         
-        manager = ConfigManager()
+        manager = ConfigManager._new_for_testing()
         
         with pytest.raises(ValueError, match="Invalid YAML"):
             manager.load_config(str(config_file), load_env_file=False)
     
+    def test_yaml_memo_returns_independent_copies(self, basic_config_file):
+        """Test that memoized YAML is not shared between loads."""
+        manager = ConfigManager._new_for_testing()
+        first = manager._load_yaml_file(basic_config_file)
+        first['ai']['api_key'] = 'mutated'
+        second = manager._load_yaml_file(basic_config_file)
+        
+        assert second == {'ai': {'api_key': 'test-key'}}
+    
+    def test_config_is_never_cached_on_disk(self, basic_config_copy, tmp_path, monkeypatch):
+        """Test that parsed config stays in memory and SHP_ overrides are re-applied on load."""
+        config_file = basic_config_copy
+        monkeypatch.setenv('SHP_AI__API_KEY', 'env-secret')
+        
+        manager = ConfigManager._new_for_testing()
+        assert manager.load_config(str(config_file), env='development', load_env_file=False).ai.api_key == 'env-secret'
+        assert not (tmp_path / '.cache').exists()
+        
+        monkeypatch.setenv('SHP_AI__API_KEY', 'rotated')
+        assert manager.reload_config(str(config_file), env='development').ai.api_key == 'rotated'
+    
+    @pytest.mark.slow
     def test_empty_config_file(self, tmp_path):
         """Test handling of empty config file."""
         config_file = tmp_path / "config.yaml"
         config_file.touch()  # Create empty file
         
-        manager = ConfigManager()
+        manager = ConfigManager._new_for_testing()
         
         # Should fail validation due to missing required fields
         with pytest.raises(ValueError):
             manager.load_config(str(config_file), load_env_file=False)
     
-    def test_missing_required_field(self, tmp_path):
+    @pytest.mark.slow
+    def test_missing_required_field(self):
         """Test validation error when required field is missing."""
-        config_data = {
-            'environment': {'env': 'development'},
-            'paths': {'data_dir': 'data'},
-            # Missing 'ai' section with required api_key
-        }
-        
-        config_file = tmp_path / "config.yaml"
-        with open(config_file, 'w') as f:
-            yaml.dump(config_data, f)
+        # Missing 'ai' section with required api_key
+        source = io.StringIO("environment:\n  env: development\npaths:\n  data_dir: data\n")
         
-        manager = ConfigManager()
+        manager = ConfigManager._new_for_testing()
         
         with pytest.raises(ValueError):
-            manager.load_config(str(config_file), load_env_file=False)
+            manager.load_config(source, load_env_file=False)
     
-    def test_invalid_data_type(self, tmp_path):
+    @pytest.mark.slow
+    def test_invalid_data_type(self):
         """Test validation error for invalid data types."""
-        config_data = {
-            'ai': {'api_key': 'test-key', 'temperature': 'not-a-number'},  # Should be float
-            'healing': {'max_attempts': 'three'}  # Should be int
-        }
-        
-        config_file = tmp_path / "config.yaml"
-        with open(config_file, 'w') as f:
-            yaml.dump(config_data, f)
+        # temperature should be a float, max_attempts an int
+        source = io.StringIO(
+            "ai:\n  api_key: test-key\n  temperature: not-a-number\n"
+            "healing:\n  max_attempts: three\n"
+        )
         
-        manager = ConfigManager()
+        manager = ConfigManager._new_for_testing()
         
         with pytest.raises(ValueError):
-            manager.load_config(str(config_file), load_env_file=False)
+            manager.load_config(source, load_env_file=False)
     
-    def test_env_value_conversion(self, tmp_path):
+    def test_env_value_conversion(self, tmp_path, monkeypatch):
         """Test automatic type conversion of environment variables."""
         config_data = {
             'ai': {'api_key': 'test-key', 'temperature': 0.0},
@@ -176,15 +237,14 @@ class TestConfigManager:
         }
         
         config_file = tmp_path / "config.yaml"
-        with open(config_file, 'w') as f:
-            yaml.dump(config_data, f)
+        _write_yaml(config_file, config_data)
         
         # Set various types via environment
-        os.environ['SHP_HEALING__MAX_ATTEMPTS'] = '10'  # String -> int
-        os.environ['SHP_HEALING__ENABLE_ROLLBACK'] = 'true'  # String -> bool
-        os.environ['SHP_AI__TEMPERATURE'] = '0.7'  # String -> float
+        monkeypatch.setenv('SHP_HEALING__MAX_ATTEMPTS', '10')  # String -> int
+        monkeypatch.setenv('SHP_HEALING__ENABLE_ROLLBACK', 'true')  # String -> bool
+        monkeypatch.setenv('SHP_AI__TEMPERATURE', '0.7')  # String -> float
         
-        manager = ConfigManager()
+        manager = ConfigManager._new_for_testing()
         config = manager.load_config(str(config_file), load_env_file=False)
         
         assert config.healing.max_attempts == 10
@@ -194,70 +254,57 @@ class TestConfigManager:
         assert config.ai.temperature == 0.7
         assert isinstance(config.ai.temperature, float)
     
-    def test_boolean_env_values(self, tmp_path):
+    @pytest.mark.parametrize("env_val,expected", [
+        ('yes', True), ('1', True), ('true', True),
+        ('no', False), ('0', False),
+    ])
+    def test_boolean_env_values(self, bool_config_file, env_val, expected, monkeypatch):
         """Test various boolean representations in environment variables."""
-        config_data = {
-            'ai': {'api_key': 'test-key'},
-            'healing': {'enable_rollback': False, 'enable_backup': False}
-        }
-        
-        config_file = tmp_path / "config.yaml"
-        with open(config_file, 'w') as f:
-            yaml.dump(config_data, f)
+        # Override the flag that is stored with the opposite value, so each case flips it
+        field = 'ENABLE_ROLLBACK' if expected else 'ENABLE_BACKUP'
+        monkeypatch.setenv(f'SHP_HEALING__{field}', env_val)
         
-        # Test various true values
-        os.environ['SHP_HEALING__ENABLE_ROLLBACK'] = 'yes'
-        manager = ConfigManager()
-        config = manager.load_config(str(config_file), load_env_file=False)
-        assert config.healing.enable_rollback is True
-        
-        ConfigManager.reset()
-        os.environ['SHP_HEALING__ENABLE_ROLLBACK'] = '1'
-        manager = ConfigManager()
-        config = manager.load_config(str(config_file), load_env_file=False)
-        assert config.healing.enable_rollback is True
-        
-        # Test various false values
-        ConfigManager.reset()
-        os.environ['SHP_HEALING__ENABLE_BACKUP'] = 'no'
-        manager = ConfigManager()
-        config = manager.load_config(str(config_file), load_env_file=False)
-        assert config.healing.enable_backup is False
+        manager = ConfigManager._new_for_testing()
+        config = manager.load_config(str(bool_config_file), load_env_file=False)
+        assert getattr(config.healing, field.lower()) is expected
     
-    def test_singleton_pattern(self, tmp_path):
+    def test_singleton_pattern(self, basic_config_file):
         """Test that ConfigManager follows singleton pattern."""
-        config_data = {'ai': {'api_key': 'test-key'}}
-        config_file = tmp_path / "config.yaml"
-        with open(config_file, 'w') as f:
-            yaml.dump(config_data, f)
-        
         manager1 = ConfigManager()
+        config = manager1.load_config(str(basic_config_file), load_env_file=False)
         manager2 = ConfigManager()
         
         assert manager1 is manager2
+        assert manager2.get_config() is config
+    
+    def test_singleton_across_threads(self):
+        """Test that concurrent first use still yields a single instance."""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            managers = list(pool.map(lambda _: ConfigManager(), range(32)))
+        
+        assert all(m is managers[0] for m in managers)
     
     def test_get_config_before_load(self):
         """Test error when trying to get config before loading."""
-        manager = ConfigManager()
+        manager = ConfigManager._new_for_testing()
         
         with pytest.raises(RuntimeError, match="Configuration not loaded"):
             manager.get_config()
     
     def test_reload_config(self, tmp_path):
         """Test reloading configuration."""
-        config_data = {'ai': {'api_key': 'original-key'}}
+        # JSON is valid YAML, and needs no YAML emitter to write
         config_file = tmp_path / "config.yaml"
-        with open(config_file, 'w') as f:
-            yaml.dump(config_data, f)
+        config_file.write_text(json.dumps({'ai': {'api_key': 'original-key'}}))
         
-        manager = ConfigManager()
+        manager = ConfigManager._new_for_testing()
         config1 = manager.load_config(str(config_file), load_env_file=False)
         assert config1.ai.api_key == 'original-key'
         
         # Modify config file
-        config_data['ai']['api_key'] = 'new-key'
-        with open(config_file, 'w') as f:
-            yaml.dump(config_data, f)
+        config_file.write_text(json.dumps({'ai': {'api_key': 'new-key'}}))
         
         config2 = manager.reload_config(str(config_file))
         assert config2.ai.api_key == 'new-key'
@@ -283,12 +330,10 @@ class TestConfigManager:
         base_file = tmp_path / "config.yaml"
         override_file = tmp_path / "config.development.yaml"
         
-        with open(base_file, 'w') as f:
-            yaml.dump(base_config, f)
-        with open(override_file, 'w') as f:
-            yaml.dump(override_config, f)
+        _write_yaml(base_file, base_config)
+        _write_yaml(override_file, override_config)
         
-        manager = ConfigManager()
+        manager = ConfigManager._new_for_testing()
         config = manager.load_config(str(base_file), env='development', load_env_file=False)
         
         # Check that base values are preserved
@@ -308,10 +353,9 @@ class TestConfigManager:
         }
         
         config_file = tmp_path / "config.yaml"
-        with open(config_file, 'w', encoding='utf-8') as f:
-            yaml.dump(config_data, f, allow_unicode=True)
+        _write_yaml(config_file, config_data)
         
-        manager = ConfigManager()
+        manager = ConfigManager._new_for_testing()
         config = manager.load_config(str(config_file), load_env_file=False)
         
         assert '测试' in str(config.paths.data_dir)
@@ -326,10 +370,9 @@ class TestConfigManager:
         }
         
         config_file = tmp_path / "config.yaml"
-        with open(config_file, 'w') as f:
-            yaml.dump(config_data, f)
+        _write_yaml(config_file, config_data)
         
-        manager = ConfigManager()
+        manager = ConfigManager._new_for_testing()
         config = manager.load_config(str(config_file), load_env_file=False)
         
         assert config.ai.api_key == 'key-with-special-chars-!@#$%^&*()'
@@ -344,27 +387,21 @@ class TestConfigManager:
         }
         
         config_file = tmp_path / "config.yaml"
-        with open(config_file, 'w') as f:
-            yaml.dump(config_data, f)
+        _write_yaml(config_file, config_data)
         
-        manager = ConfigManager()
+        manager = ConfigManager._new_for_testing()
         # Should load successfully, ignoring extra fields
         config = manager.load_config(str(config_file), load_env_file=False)
         assert config.ai.api_key == 'test-key'
     
-    def test_env_variable_expansion(self, tmp_path):
+    def test_env_variable_expansion(self, tmp_path, monkeypatch):
         """Test expansion of environment variables in config values."""
-        os.environ['TEST_API_KEY'] = 'expanded-key-123'
-        
-        config_data = {
-            'ai': {'api_key': '${TEST_API_KEY}'}
-        }
+        monkeypatch.setenv('TEST_API_KEY', 'expanded-key-123')
         
         config_file = tmp_path / "config.yaml"
-        with open(config_file, 'w') as f:
-            yaml.dump(config_data, f)
+        config_file.write_text("ai:\n  api_key: '${TEST_API_KEY}'\n")
         
-        manager = ConfigManager()
+        manager = ConfigManager._new_for_testing()
         config = manager.load_config(str(config_file), load_env_file=False)
         
         # Note: expandvars is applied to paths, not all strings
@@ -379,15 +416,15 @@ class TestConfigManager:
                 'data_dir': str(tmp_path / 'data'),
                 'logs_dir': str(tmp_path / 'logs'),
                 'dashboard_dir': str(tmp_path / 'dashboard'),
-                'backup_dir': str(tmp_path / 'backups')
+                'backup_dir': str(tmp_path / 'backups'),
+                'cache_dir': str(tmp_path / 'cache')
             }
         }
         
         config_file = tmp_path / "config.yaml"
-        with open(config_file, 'w') as f:
-            yaml.dump(config_data, f)
+        _write_yaml(config_file, config_data)
         
-        manager = ConfigManager()
+        manager = ConfigManager._new_for_testing()
         config = manager.load_config(str(config_file), load_env_file=False)
         
         # Directories should be created
@@ -395,6 +432,12 @@ class TestConfigManager:
         assert (tmp_path / 'logs').exists()
         assert (tmp_path / 'dashboard').exists()
         assert (tmp_path / 'backups').exists()
+        assert (tmp_path / 'cache').exists()
+        
+        # A directory removed after the first call is created again
+        (tmp_path / 'logs').rmdir()
+        config.ensure_directories()
+        assert (tmp_path / 'logs').exists()
 
 
 if __name__ == '__main__':
@@ -1,67 +1,120 @@
 import unittest
-import pandas as pd
+import io
 import os
+import shutil
 import sys
+import tempfile
 
-# Add src to path so we can import the pipeline logic
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
-
-from etl_pipeline import run_pipeline
+# Add src to path so we can import the pipeline logic (once, however often
+# this module is imported)
+_SRC_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+if _SRC_PATH not in sys.path:
+    sys.path.append(_SRC_PATH)
 
 class TestETLEdgeCases(unittest.TestCase):
     
     def setUp(self):
-        self.test_data_dir = r'E:\self_healing_pipeline\data\raw'
-        self.test_file = os.path.join(self.test_data_dir, 'users.csv')
-        os.makedirs(self.test_data_dir, exist_ok=True)
+        # Input is fed from memory; only processed output touches disk
+        self.source = None
+        self.df = None
+        self.output_dir = tempfile.mkdtemp()
 
     def tearDown(self):
         # Clean up after tests
-        if os.path.exists(self.test_file):
-            os.remove(self.test_file)
+        shutil.rmtree(self.output_dir, ignore_errors=True)
 
     def create_dummy_csv(self, content):
-        with open(self.test_file, 'w') as f:
+        self.source = io.StringIO(content)
+
+    def create_csv_file(self, content):
+        # Goes through read_csv's file path (pyarrow when installed, else pandas)
+        self.source = os.path.join(self.output_dir, 'users.csv')
+        with open(self.source, 'w', newline='') as f:
             f.write(content)
 
+    def create_dummy_frame(self, data):
+        # Cases that are not about CSV parsing hand the pipeline a parsed frame
+        import pandas as pd
+        self.df = pd.DataFrame(data)
+
+    def run_pipeline(self):
+        # Imported on first use so collecting this module does not load pandas
+        from etl_pipeline import run_pipeline
+        return run_pipeline(
+            source=self.source,
+            output_base=os.path.join(self.output_dir, 'users_processed'),
+            validation_cache=os.path.join(self.output_dir, 'validation.cache'),
+            df=self.df
+        )
+
     def test_empty_csv(self):
         """Test how the pipeline handles an empty file."""
         print("\n[Test] Empty CSV")
+        import pandas as pd
         self.create_dummy_csv("") 
         # Pandas read_csv on empty file raises EmptyDataError
         with self.assertRaises(pd.errors.EmptyDataError):
-            run_pipeline()
+            self.run_pipeline()
 
     def test_extra_columns(self):
         """Test if extra columns cause failure (they shouldn't if we just rename known ones)."""
         print("\n[Test] Extra Columns")
         # 'age' is an extra column
-        content = "user_id,full_name,email,signup_date,age\n1,Alice,alice@example.com,2023-01-01,30"
-        self.create_dummy_csv(content)
+        self.create_dummy_frame({
+            "uid": [1], "customer_name": ["Alice"], "email": ["alice@example.com"],
+            "signup_date": ["2023-01-01"], "age": [30]
+        })
         
         try:
-            run_pipeline()
+            self.run_pipeline()
         except Exception as e:
             self.fail(f"Pipeline failed with extra columns: {e}")
+        # CSV is the default output whether or not pyarrow is installed
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, 'users_processed.csv')))
+
+    def test_extra_columns_in_csv_file(self):
+        """Test a real file with an extra column is read, processed and written."""
+        print("\n[Test] Extra Columns (CSV file)")
+        self.create_csv_file(
+            "uid,customer_name,email,signup_date,age\n1,Alice,alice@example.com,2023-01-01,30\n"
+        )
+        
+        self.run_pipeline()
+        import pandas as pd
+        out = pd.read_csv(os.path.join(self.output_dir, 'users_processed.csv'))
+        self.assertEqual(out.loc[0, 'email_address'], 'alice@example.com')
 
     def test_missing_columns(self):
         """Test if missing columns cause immediate failure."""
         print("\n[Test] Missing Columns")
         # 'email' is missing
-        content = "user_id,full_name,signup_date\n1,Alice,2023-01-01"
-        self.create_dummy_csv(content)
+        self.create_dummy_frame({
+            "uid": [1], "customer_name": ["Alice"], "signup_date": ["2023-01-01"]
+        })
         
         with self.assertRaises(ValueError):
-            run_pipeline()
+            self.run_pipeline()
 
     def test_malformed_date(self):
         """Test if invalid dates cause failure."""
         print("\n[Test] Malformed Date")
-        content = "user_id,full_name,email,signup_date\n1,Alice,alice@example.com,NOT_A_DATE"
-        self.create_dummy_csv(content)
+        self.create_dummy_frame({
+            "uid": [1], "customer_name": ["Alice"], "email": ["alice@example.com"],
+            "signup_date": ["NOT_A_DATE"]
+        })
         
         with self.assertRaises(Exception):
-            run_pipeline()
+            self.run_pipeline()
+
+    def test_malformed_date_in_csv_file(self):
+        """Test a bad date read from a real file fails with a ValueError, with or without pyarrow."""
+        print("\n[Test] Malformed Date (CSV file)")
+        self.create_csv_file(
+            "uid,customer_name,email,signup_date\n1,Alice,alice@example.com,NOT_A_DATE\n"
+        )
+        
+        with self.assertRaises(ValueError):
+            self.run_pipeline()
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,44 +1,37 @@
-import pytest
-import pandas as pd
 import os
-from src.doctor import DataDoctor
-from src.config_manager import ConfigManager
+
+import pytest
 from src.config_schema import Config, AIConfig
 
-class TestEnhancedHealing:
-    def setup_method(self):
-        # Create a dummy config
-        self.config = Config(
-            ai=AIConfig(
-                api_key=os.getenv('SHP_AI_API_KEY', 'dummy_key'),
-                model='openai/gpt-4o-mini'
-            )
-        )
-        self.doctor = DataDoctor(config=self.config)
+# The key cannot change mid-run; without a real one the live LLM tests are skipped
+_API_KEY = os.getenv('SHP_AI_API_KEY', 'dummy_key')
+_SKIP_LIVE = _API_KEY == 'dummy_key'
+
 
-    def test_type_mismatch_healing(self, tmp_path):
+@pytest.mark.skipif(_SKIP_LIVE, reason="Skipping integration test without API key")
+class TestEnhancedHealing:
+    def test_type_mismatch_healing(self, tmp_path, doctor):
         # 1. Create a CSV with a string in an integer column
         data_path = tmp_path / "data.csv"
-        with open(data_path, "w") as f:
-            f.write("id,value\n1,100\n2,not_a_number\n3,300")
+        data_path.write_text("id,value\n1,100\n2,not_a_number\n3,300")
             
         # 2. Create a script that expects integers and fails
+        # Forward slashes need no escaping inside the generated string literal
         script_path = tmp_path / "etl_script.py"
-        script_content = """
+        script_content = f"""
 import pandas as pd
 
 def run():
-    df = pd.read_csv(r'DATA_PATH')
+    df = pd.read_csv(r'{data_path.as_posix()}')
     # This will fail if value is not numeric
     total = df['value'].astype(int).sum()
-    print(f"Total: {total}")
+    print(f"Total: {{total}}")
 
 if __name__ == "__main__":
     run()
-""".replace("DATA_PATH", str(data_path).replace("\\", "\\\\"))
+"""
         
-        with open(script_path, "w") as f:
-            f.write(script_content)
+        script_path.write_text(script_content)
             
         # 3. Simulate the error log
         error_log = """
@@ -50,43 +43,292 @@ ValueError: invalid literal for int() with base 10: 'not_a_number'
 
         # 4. Run the doctor
         # Note: We need a real API key for this to actually generate code.
-        # If no key is present, we might mock the LLM or skip.
-        if self.config.ai.api_key == 'dummy_key':
-            pytest.skip("Skipping integration test without API key")
-            
-        healed = self.doctor.diagnose_and_heal(str(script_path), str(data_path), error_log)
+        healed = doctor.diagnose_and_heal(str(script_path), str(data_path), error_log)
         
         assert healed is True
         
         # 5. Verify the fix
-        with open(script_path, "r") as f:
-            new_code = f.read()
+        new_code = script_path.read_text()
             
         # The fix should handle non-numeric values, e.g., using pd.to_numeric with errors='coerce'
         assert "pd.to_numeric" in new_code or "errors='coerce'" in new_code or "try" in new_code
 
-    def test_missing_dependency_healing(self, tmp_path):
+    def test_missing_dependency_healing(self, tmp_path, doctor, dummy_csv):
         # 1. Create a script with missing dependency
         script_path = tmp_path / "missing_dep.py"
-        with open(script_path, "w") as f:
-            f.write("import non_existent_package\n")
+        script_path.write_text("import non_existent_package\n")
             
         # 2. Error log
         error_log = "ModuleNotFoundError: No module named 'non_existent_package'"
         
         # 3. Run doctor
-        if self.config.ai.api_key == 'dummy_key':
-            pytest.skip("Skipping integration test without API key")
-            
-        # We need a dummy data path even if not used
-        data_path = tmp_path / "dummy.csv"
-        with open(data_path, "w") as f:
-            f.write("col1\n1")
 
-        healed = self.doctor.diagnose_and_heal(str(script_path), str(data_path), error_log)
+        # The doctor needs a data path even though this script never reads it
+        healed = doctor.diagnose_and_heal(str(script_path), str(dummy_csv), error_log)
         
         # The fix might be to try installing it (which we can't do in code easily without running subprocess)
         # or commenting it out, or handling the import error.
         # Since we asked for "Python code only", the AI might wrap it in try-except or suggest installation in comments.
         # Let's see what it does.
         assert healed is True
+
+
+class TestRuleBasedHealing:
+    def test_renamed_column_is_fixed_without_llm(self, tmp_path, rule_doctor):
+        data_path = tmp_path / "data.csv"
+        data_path.write_text("uid,name\n1,a\n2,b\n")
+        script_path = tmp_path / "etl_script.py"
+        script_path.write_text(
+            "import csv\n"
+            f"with open(r'{data_path.as_posix()}', newline='') as f:\n"
+            "    rows = list(csv.DictReader(f))\n"
+            "print([row['user_id'] for row in rows])\n"
+        )
+        error_log = "Traceback (most recent call last):\nKeyError: 'user_id'\n"
+
+        assert rule_doctor.diagnose_and_heal(str(script_path), str(data_path), error_log) is True
+        assert "row['uid']" in script_path.read_text()
+
+    def test_every_renamed_column_is_fixed(self, tmp_path, rule_doctor):
+        data_path = tmp_path / "data.csv"
+        data_path.write_text("uid,customer_name\n1,a\n2,b\n")
+        script_path = tmp_path / "etl_script.py"
+        script_path.write_text(
+            "import csv\n"
+            f"with open(r'{data_path.as_posix()}', newline='') as f:\n"
+            "    rows = list(csv.DictReader(f))\n"
+            "print([(row['user_id'], row['full_name']) for row in rows])\n"
+        )
+        error_log = "Traceback (most recent call last):\nKeyError: 'user_id'\n"
+
+        assert rule_doctor.diagnose_and_heal(str(script_path), str(data_path), error_log) is True
+        assert "(row['uid'], row['customer_name'])" in script_path.read_text()
+
+    @pytest.fixture
+    def rule_doctor(self, tmp_path, monkeypatch):
+        from src.advanced_doctor import AdvancedDataDoctor
+        from src.rollback_manager import RollbackManager
+
+        manager = RollbackManager(backup_dir=str(tmp_path / "backups"))
+        manager.version_history_file = str(tmp_path / "version_history.jsonl")
+        config = Config(ai=AIConfig(api_key='dummy_key'))
+        doctor = AdvancedDataDoctor(config=config, rollback_manager=manager)
+
+        def fail_llm(*args, **kwargs):
+            raise AssertionError("LLM should not be called")
+        monkeypatch.setattr(doctor.llm, "generate_fix", fail_llm)
+        yield doctor
+        manager.close()
+
+
+class TestDataHead:
+    @pytest.mark.parametrize("mask, sample_sent", [(True, False), (False, True)])
+    def test_sample_rows_follow_masking(self, tmp_path, mask, sample_sent):
+        from src.advanced_doctor import AdvancedDataDoctor
+        from src.config_schema import SecurityConfig
+        from src.rollback_manager import RollbackManager
+
+        data_path = tmp_path / "data.csv"
+        data_path.write_text("email,age\nalice@example.com,30\n")
+        config = Config(ai=AIConfig(api_key='dummy_key'), security=SecurityConfig(mask_sensitive_data=mask))
+        doctor = AdvancedDataDoctor(
+            config=config, rollback_manager=RollbackManager(backup_dir=str(tmp_path / "backups"))
+        )
+
+        data_head = doctor._read_data_head(str(data_path))
+        assert "['email', 'age']" in data_head
+        assert "Data Types:" in data_head
+        assert ("alice@example.com" in data_head) is sample_sent
+
+
+class TestInProcessTestRun:
+    def test_process_state_is_restored(self, tmp_path):
+        import os
+        import sys
+        from src.advanced_doctor import AdvancedDataDoctor
+        from src.config_schema import HealingConfig
+        from src.rollback_manager import RollbackManager
+
+        script_dir = tmp_path / "src"
+        sibling_dir = tmp_path / "src_old"
+        script_dir.mkdir()
+        sibling_dir.mkdir()
+        (sibling_dir / "sibling_helper.py").write_text("VALUE = 1\n")
+        script_path = script_dir / "etl_script.py"
+        # Imports from a sibling directory whose name shares the script dir's prefix
+        script_path.write_text(
+            "import os, sys\n"
+            f"sys.path.append(r'{sibling_dir.as_posix()}')\n"
+            "import sibling_helper\n"
+            f"sys.path.remove(r'{sibling_dir.as_posix()}')\n"
+            f"os.chdir(r'{tmp_path.as_posix()}')\n"
+            "sys.argv.append('--extra')\n"
+            "sys.exit(1)\n"
+        )
+
+        config = Config(ai=AIConfig(api_key='dummy_key'), healing=HealingConfig(isolate_test_runs=False))
+        manager = RollbackManager(backup_dir=str(tmp_path / "backups"))
+        doctor = AdvancedDataDoctor(config=config, rollback_manager=manager)
+        cwd, argv = os.getcwd(), list(sys.argv)
+
+        try:
+            assert doctor._test_fix(str(script_path))[0] is False
+            assert os.getcwd() == cwd
+            assert sys.argv == argv
+            assert "sibling_helper" in sys.modules
+        finally:
+            sys.modules.pop("sibling_helper", None)
+
+    def test_compiled_scripts_are_bounded(self):
+        from src.advanced_doctor import _compile_script
+
+        # Every LLM candidate is distinct source; only the most recent are kept
+        for i in range(100):
+            _compile_script(f"print({i})\n".encode(), "etl_script.py")
+        info = _compile_script.cache_info()
+        assert info.currsize <= info.maxsize < 100
+
+
+class TestLLMFixCache:
+    def test_fix_is_cached_only_after_it_passes(self, tmp_path, monkeypatch):
+        from types import SimpleNamespace
+        from src.advanced_doctor import AdvancedLLM
+        from src.config_schema import PathConfig
+
+        config = Config(ai=AIConfig(api_key='dummy_key'), paths=PathConfig(cache_dir=str(tmp_path)))
+        llm = AdvancedLLM(config)
+        chunk = SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="print('fixed')"))])
+        monkeypatch.setattr(llm.client.chat.completions, "create", lambda **kwargs: iter([chunk]))
+
+        fix = llm.generate_fix("KeyError: 'x'", "print(x)", "[]")
+        assert list(tmp_path.glob("llm/*.txt")) == []
+        llm.record_result(fix, False)
+        assert list(tmp_path.glob("llm/*.txt")) == []
+
+        fix = llm.generate_fix("KeyError: 'x'", "print(x)", "[]")
+        llm.record_result(fix, True)
+        cached = list(tmp_path.glob("llm/*.txt"))
+        assert len(cached) == 1
+
+        # A cached fix that later fails is evicted rather than replayed
+        assert llm.generate_fix("KeyError: 'x'", "print(x)", "[]") == fix
+        llm.record_result(fix, False)
+        assert not cached[0].exists()
+
+    def test_untested_fixes_are_dropped_when_healing_ends(self, tmp_path, monkeypatch):
+        from src.advanced_doctor import AdvancedDataDoctor
+        from src.rollback_manager import RollbackManager
+
+        data_path = tmp_path / "data.csv"
+        data_path.write_text("a\n1\n")
+        script_path = tmp_path / "etl_script.py"
+        script_path.write_text("raise ValueError('bad data')\n")
+        manager = RollbackManager(backup_dir=str(tmp_path / "backups"))
+        manager.version_history_file = str(tmp_path / "version_history.jsonl")
+        doctor = AdvancedDataDoctor(config=Config(ai=AIConfig(api_key='dummy_key')), rollback_manager=manager)
+
+        def generate_fix(*args, **kwargs):
+            # Generated and registered, but the heal fails before it is tested
+            doctor.llm._untested["print('fixed')"] = tmp_path / "fix.txt"
+            raise RuntimeError("connection reset")
+        monkeypatch.setattr(doctor.llm, "generate_fix", generate_fix)
+
+        try:
+            with pytest.raises(RuntimeError):
+                doctor.diagnose_and_heal(str(script_path), str(data_path), "ValueError: bad data")
+        finally:
+            manager.close()
+        assert doctor.llm._untested == {}
+
+
+class TestScriptWrite:
+    def test_rewrite_keeps_mode_and_leaves_no_tmp_file(self, tmp_path, monkeypatch):
+        import stat
+        from src.advanced_doctor import AdvancedDataDoctor
+        from src.rollback_manager import RollbackManager
+
+        script_path = tmp_path / "etl_script.py"
+        script_path.write_text("print('v1')\n")
+        script_path.chmod(0o750)
+        doctor = AdvancedDataDoctor(
+            config=Config(ai=AIConfig(api_key='dummy_key')),
+            rollback_manager=RollbackManager(backup_dir=str(tmp_path / "backups"))
+        )
+
+        doctor._write_script(str(script_path), "print('v2')\n")
+        assert script_path.read_text() == "print('v2')\n"
+        assert stat.S_IMODE(script_path.stat().st_mode) == 0o750
+
+        def fail_replace(src, dst):
+            raise OSError("disk full")
+        monkeypatch.setattr(os, "replace", fail_replace)
+        with pytest.raises(OSError):
+            doctor._write_script(str(script_path), "print('v3')\n")
+        assert script_path.read_text() == "print('v2')\n"
+        assert [p.name for p in tmp_path.iterdir() if p.suffix == ".tmp"] == []
+
+
+class TestScriptCache:
+    def test_rewrite_with_same_mtime_is_reread(self, tmp_path):
+        from src.doctor import _read_script, _stat_key
+
+        script_path = tmp_path / "etl_script.py"
+        script_path.write_text("print('v1')\n")
+        mtime_ns = os.stat(script_path).st_mtime_ns
+        assert _read_script(str(script_path), _stat_key(script_path)) == "print('v1')\n"
+
+        # Rewritten within the filesystem's timestamp granularity
+        script_path.write_text("print('version 2')\n")
+        os.utime(script_path, ns=(mtime_ns, mtime_ns))
+        assert _read_script(str(script_path), _stat_key(script_path)) == "print('version 2')\n"
+
+
+class TestRollbackManager:
+    def test_history_is_appended_and_compacted(self, tmp_path):
+        import json
+        from src.rollback_manager import RollbackManager
+
+        script_path = tmp_path / "etl_script.py"
+        script_path.write_text("print('v1')\n")
+        manager = RollbackManager(backup_dir=str(tmp_path / "backups"))
+        manager.version_history_file = str(tmp_path / "version_history.jsonl")
+
+        manager.create_backup(str(script_path))
+        script_path.write_text("print('v2')\n")
+        assert manager.rollback(str(script_path)) is True
+        assert script_path.read_text() == "print('v1')\n"
+
+        lines = (tmp_path / "version_history.jsonl").read_text().splitlines()
+        assert [json.loads(line)['action'] for line in lines] == ['backup', 'rollback']
+
+        compacted = manager.compact_history()
+        with open(compacted) as f:
+            assert [entry['action'] for entry in json.load(f)] == ['backup', 'rollback']
+
+        # close() releases the log; a later change reopens it and appends
+        manager.close()
+        assert manager._history_fp is None
+        manager.create_backup(str(script_path))
+        manager.close()
+        lines = (tmp_path / "version_history.jsonl").read_text().splitlines()
+        assert [json.loads(line)['action'] for line in lines] == ['backup', 'rollback', 'backup']
+
+    def test_legacy_history_is_imported_and_kept(self, tmp_path):
+        import json
+        from src.rollback_manager import RollbackManager
+
+        legacy = [{'timestamp': '2024-01-01T00:00:00', 'file': 'etl.py', 'backup': 'etl.py.bak', 'action': 'backup'}]
+        (tmp_path / "version_history.json").write_text(json.dumps(legacy))
+        script_path = tmp_path / "etl_script.py"
+        script_path.write_text("print('v1')\n")
+        manager = RollbackManager(backup_dir=str(tmp_path / "backups"))
+        manager.version_history_file = str(tmp_path / "version_history.jsonl")
+
+        manager.create_backup(str(script_path))
+        compacted = manager.compact_history()
+        manager.close()
+
+        with open(compacted) as f:
+            assert [entry['file'] for entry in json.load(f)] == ['etl.py', str(script_path)]
+        # The legacy file is read, never overwritten
+        assert json.loads((tmp_path / "version_history.json").read_text()) == legacy
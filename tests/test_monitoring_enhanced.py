@@ -1,5 +1,8 @@
 import pytest
 import time
+import json
+import logging
+import threading
 from unittest.mock import MagicMock, patch
 from src.metrics import MetricsManager
 from src.alert_manager import AlertManager
@@ -48,30 +51,194 @@ class TestAlertManager:
         )
         self.alert_manager = AlertManager(self.config)
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_send_alert(self, mock_post):
         mock_post.return_value.status_code = 200
         
         self.alert_manager.send_alert("Test Alert", "This is a test")
+        self.alert_manager.flush()
         
         mock_post.assert_called_once()
         args, kwargs = mock_post.call_args
-        assert kwargs['json']['attachments'][0]['title'] == "Test Alert"
+        payload = json.loads(kwargs['data'])
+        assert payload['attachments'][0]['title'] == "Test Alert"
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_deduplication(self, mock_post):
         mock_post.return_value.status_code = 200
         
         # First alert
         self.alert_manager.send_alert("Duplicate Alert", "First occurrence")
+        self.alert_manager.flush()
         assert mock_post.call_count == 1
         
         # Second alert (immediate) - should be suppressed
         self.alert_manager.send_alert("Duplicate Alert", "Second occurrence")
+        self.alert_manager.flush()
         assert mock_post.call_count == 1
         
         # Third alert (after window) - should be sent
-        # We mock time.time to simulate passage of time
-        with patch('time.time', return_value=time.time() + 301):
+        # We mock time.monotonic to simulate passage of time
+        with patch('time.monotonic', return_value=time.monotonic() + 301):
             self.alert_manager.send_alert("Duplicate Alert", "Third occurrence")
+            self.alert_manager.flush()
             assert mock_post.call_count == 2
+
+    @patch('requests.Session.post')
+    def test_deduplication_is_bounded(self, mock_post):
+        mock_post.return_value.status_code = 200
+        self.alert_manager.max_tracked_alerts = 2
+        
+        for i in range(3):
+            self.alert_manager.send_alert(f"Alert {i}", "Distinct title")
+        
+        # Oldest title is evicted once the tracker is full
+        assert list(self.alert_manager.last_alert_times) == ["Alert 1", "Alert 2"]
+        self.alert_manager.send_alert("Alert 0", "Sent again")
+        self.alert_manager.flush()
+        # Alerts queued together may share a POST, so count attachments
+        titles = [
+            attachment['title']
+            for call in mock_post.call_args_list
+            for attachment in json.loads(call.kwargs['data'])['attachments']
+        ]
+        assert titles == ["Alert 0", "Alert 1", "Alert 2", "Alert 0"]
+
+    @patch('requests.Session.post')
+    def test_queued_alerts_are_batched(self, mock_post):
+        mock_post.return_value.status_code = 200
+        # Hold the worker on its first POST so the rest queue up behind it
+        posting, release = threading.Event(), threading.Event()
+        def post(*args, **kwargs):
+            posting.set()
+            release.wait(5)
+            return mock_post.return_value
+        mock_post.side_effect = post
+        
+        self.alert_manager.send_alert("Alert 0", "Distinct title")
+        assert posting.wait(5)
+        for i in range(1, 4):
+            self.alert_manager.send_alert(f"Alert {i}", "Distinct title")
+        release.set()
+        self.alert_manager.flush()
+        
+        assert mock_post.call_count == 2
+        second = json.loads(mock_post.call_args_list[1].kwargs['data'])
+        assert [a['title'] for a in second['attachments']] == ["Alert 1", "Alert 2", "Alert 3"]
+
+    @patch('requests.Session.post')
+    def test_concurrent_first_alerts_start_one_worker(self, mock_post):
+        mock_post.return_value.status_code = 200
+        barrier = threading.Barrier(8)
+        started = []
+        real_start = self.alert_manager._start_slack_worker
+        def start():
+            started.append(1)
+            real_start()
+        self.alert_manager._start_slack_worker = start
+        
+        def send(i):
+            barrier.wait()
+            self.alert_manager.send_alert(f"Alert {i}", "Concurrent")
+        threads = [threading.Thread(target=send, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.alert_manager.flush()
+        
+        assert started == [1]
+
+    @patch('requests.Session.post')
+    def test_flush_gives_up_after_timeout(self, mock_post):
+        from src.alert_manager import _started_managers
+        # An unreachable webhook must not hang shutdown
+        release = threading.Event()
+        def post(*args, **kwargs):
+            release.wait(5)
+            return mock_post.return_value
+        mock_post.side_effect = post
+        
+        self.alert_manager.send_alert("Slow Alert", "Webhook hangs")
+        assert self.alert_manager in _started_managers
+        start = time.monotonic()
+        assert self.alert_manager.flush(timeout=0.1) is False
+        assert time.monotonic() - start < 2
+        
+        release.set()
+        assert self.alert_manager.flush() is True
+
+class TestMonitoringSystem:
+    def test_history_is_appended_as_json_lines(self, tmp_path):
+        from src.config_schema import AIConfig, PathConfig
+        from src.monitoring import MonitoringSystem
+        config = Config(
+            ai=AIConfig(api_key="dummy_key"),
+            paths=PathConfig(logs_dir=tmp_path / "logs", dashboard_dir=tmp_path / "dashboard")
+        )
+        
+        monitor = MonitoringSystem(config=config)
+        monitor.log_error("first")
+        monitor.log_error("second")
+        with patch.object(monitor.alert_manager, 'flush') as flush:
+            monitor.close()
+        # Queued alerts are delivered before shutdown
+        flush.assert_called_once()
+        
+        lines = (tmp_path / "logs" / "metrics.jsonl").read_text().splitlines()
+        assert [json.loads(line)["message"] for line in lines] == ["first", "second"]
+        # The second event fell inside the throttle window and is rendered on close
+        assert "second" in (tmp_path / "dashboard" / "index.html").read_text()
+        
+        # History is rebuilt from the log on restart
+        reopened = MonitoringSystem(config=config)
+        assert len(reopened.history) == 2
+        reopened.close()
+
+    def test_torn_last_line_is_dropped(self, tmp_path, caplog):
+        from src.config_schema import AIConfig, PathConfig
+        from src.monitoring import MonitoringSystem
+        config = Config(
+            ai=AIConfig(api_key="dummy_key"),
+            paths=PathConfig(logs_dir=tmp_path / "logs", dashboard_dir=tmp_path / "dashboard")
+        )
+        (tmp_path / "logs").mkdir()
+        metrics_file = tmp_path / "logs" / "metrics.jsonl"
+        metrics_file.write_text(
+            '{"timestamp": "2024-01-01T00:00:00", "type": "ERROR", "message": "kept"}\n{"timestamp": "2024-01-'
+        )
+        
+        with caplog.at_level(logging.WARNING, logger="src.monitoring"):
+            monitor = MonitoringSystem(config=config)
+        assert [event["message"] for event in monitor.history] == ["kept"]
+        assert "Truncating incomplete last line" in caplog.text
+        monitor.log_error("next")
+        monitor.close()
+        
+        # The next event starts on its own line, so a restart reads everything
+        reopened = MonitoringSystem(config=config)
+        assert [event["message"] for event in reopened.history] == ["kept", "next"]
+        reopened.close()
+
+    def test_legacy_history_is_imported_once(self, tmp_path):
+        from src.config_schema import AIConfig, PathConfig
+        from src.monitoring import MonitoringSystem, _open_monitors
+        config = Config(
+            ai=AIConfig(api_key="dummy_key"),
+            paths=PathConfig(logs_dir=tmp_path / "logs", dashboard_dir=tmp_path / "dashboard")
+        )
+        (tmp_path / "logs").mkdir()
+        legacy = [{"timestamp": "2024-01-01T00:00:00", "type": "ERROR", "message": "old"}]
+        (tmp_path / "logs" / "metrics.json").write_text(json.dumps(legacy))
+        
+        monitor = MonitoringSystem(config=config)
+        assert monitor.history == legacy
+        assert monitor in _open_monitors
+        monitor.log_error("new")
+        monitor.close()
+        assert monitor not in _open_monitors
+        
+        # The import happens on the first run only
+        reopened = MonitoringSystem(config=config)
+        assert [event["message"] for event in reopened.history] == ["old", "new"]
+        reopened.close()
@@ -1,33 +1,55 @@
 import pytest
 import pandas as pd
 import numpy as np
-from src.validator import Validator, DataValidationError
-from src.validation_rules import NotNullRule, UniqueRule, TypeRule, RangeRule
+from src import validator as validator_module
+from src.validator import Validator, DataValidationError, frame_signature
+from src.validation_rules import NotNullRule, UniqueRule, TypeRule, RangeRule, ValidationResult
+
+# Rules only read their input, so each frame is built once per module
+@pytest.fixture(scope="module")
+def df_with_nulls():
+    return pd.DataFrame({'a': [1, 2, None]})
+
+
+@pytest.fixture(scope="module")
+def df_with_dupes():
+    return pd.DataFrame({'id': [1, 2, 2]})
+
+
+@pytest.fixture(scope="module")
+def df_out_of_range():
+    return pd.DataFrame({'age': [20, 15, 60]})
+
+
+@pytest.fixture(scope="module")
+def df_clean():
+    return pd.DataFrame({'a': [1, 2, 3], 'id': [1, 2, 3], 'age': [20, 25, 60]})
+
+
+# (rule, fixture holding data it rejects, expected message fragment)
+RULE_CASES = [
+    (NotNullRule('a'), 'df_with_nulls', "contains 1 null values"),
+    (UniqueRule('id'), 'df_with_dupes', "contains 1 duplicate values"),
+    (RangeRule('age', min_val=18), 'df_out_of_range', "values < 18"),
+]
 
 class TestValidator:
-    def test_not_null_rule(self):
-        df = pd.DataFrame({'a': [1, 2, None]})
-        rule = NotNullRule('a')
-        result = rule.check(df)
+    @pytest.mark.parametrize("rule,bad_frame,message", RULE_CASES)
+    def test_rule_rejects_bad_and_accepts_clean_data(self, rule, bad_frame, message, df_clean, request):
+        result = rule.check(request.getfixturevalue(bad_frame))
         assert result.success is False
-        assert "contains 1 null values" in result.message
-
-        df_clean = pd.DataFrame({'a': [1, 2, 3]})
+        assert message in result.message
         assert rule.check(df_clean).success is True
 
-    def test_unique_rule(self):
-        df = pd.DataFrame({'id': [1, 2, 2]})
-        rule = UniqueRule('id')
-        result = rule.check(df)
-        assert result.success is False
-        assert "contains 1 duplicate values" in result.message
+    def test_type_rule(self):
+        df = pd.DataFrame({'id': [1, 2], 'score': [1.5, 2.0], 'name': ['a', 'b']})
+        assert TypeRule('id', int).check(df).success is True
+        assert TypeRule('score', float).check(df).success is True
+        assert TypeRule('name', str).check(df).success is True
 
-    def test_range_rule(self):
-        df = pd.DataFrame({'age': [20, 15, 60]})
-        rule = RangeRule('age', min_val=18)
-        result = rule.check(df)
+        result = TypeRule('name', int).check(df)
         assert result.success is False
-        assert "values < 18" in result.message
+        assert "expected int, got" in result.message
 
     def test_validator_aggregation(self):
         df = pd.DataFrame({
@@ -50,6 +72,19 @@ class TestValidator:
         assert "contains 1 null values" in str(excinfo.value)
         assert "values < 18" in str(excinfo.value)
 
+    def test_validator_scans_float_column_once_for_null_and_range_rules(self):
+        df = pd.DataFrame({'age': [np.nan, np.nan, 5.0, 200.0, 30.0]})
+        rules = [NotNullRule('age'), RangeRule('age', min_val=18), RangeRule('age', max_val=100)]
+        
+        with pytest.raises(DataValidationError) as excinfo:
+            Validator(rules).validate(df)
+        
+        assert excinfo.value.errors == [
+            "Column 'age' contains 2 null values",
+            "Column 'age' has 1 values < 18",
+            "Column 'age' has 1 values > 100",
+        ]
+
     def test_validator_success(self):
         df = pd.DataFrame({
             'id': [1, 2, 3],
@@ -58,3 +93,96 @@ class TestValidator:
         rules = [UniqueRule('id'), RangeRule('age', min_val=18)]
         validator = Validator(rules)
         assert validator.validate(df) is True
+
+    def test_validator_rechecks_data_on_every_call(self):
+        rules = [UniqueRule('id'), NotNullRule('id')]
+        validator = Validator(rules)
+        df = pd.DataFrame({'id': [1, 2, 3]})
+        
+        assert validator.validate(df) is True
+        assert validator.validate(df.copy()) is True
+        
+        df.loc[2, 'id'] = 1
+        with pytest.raises(DataValidationError, match="contains 1 duplicate values"):
+            validator.validate(df)
+
+    def test_validator_skips_rules_for_signature_that_passed(self, tmp_path, monkeypatch):
+        cache_file = str(tmp_path / "validation.cache")
+        df = pd.DataFrame({'id': [1, 2, 3]})
+        sig = "users-v1"
+        
+        assert Validator([UniqueRule('id')], cache_file=cache_file).validate(df, sig=sig) is True
+        
+        # A fresh validator trusts the recorded pass for the same rules and signature
+        def fail(*args, **kwargs):
+            raise AssertionError("rules should not run")
+        with monkeypatch.context() as m:
+            m.setattr(UniqueRule, "check_array", fail)
+            assert Validator([UniqueRule('id')], cache_file=cache_file).validate(df, sig=sig) is True
+        
+        # Different data or different rules validate again
+        df.loc[2, 'id'] = 1
+        with pytest.raises(DataValidationError):
+            Validator([UniqueRule('id')], cache_file=cache_file).validate(df, sig="users-v2")
+        with pytest.raises(DataValidationError):
+            Validator([RangeRule('id', min_val=2)], cache_file=cache_file).validate(df, sig=sig)
+
+    def test_recorded_pass_is_tied_to_rule_parameters(self, tmp_path):
+        class MaxLengthRule(NotNullRule):
+            # Custom rule that keeps the default key(), which ignores max_len
+            def __init__(self, column, max_len):
+                super().__init__(column)
+                self.max_len = max_len
+
+            def check(self, df):
+                too_long = int((df[self.column].str.len() > self.max_len).sum())
+                return ValidationResult(not too_long, f"{too_long} values too long")
+
+            def check_array(self, values, null_mask):
+                return None
+
+        cache_file = str(tmp_path / "validation.cache")
+        df = pd.DataFrame({'name': ['alice', 'bob']})
+        sig = "users-v1"
+        
+        assert Validator([MaxLengthRule('name', 10)], cache_file=cache_file).validate(df, sig=sig) is True
+        with pytest.raises(DataValidationError, match="1 values too long"):
+            Validator([MaxLengthRule('name', 3)], cache_file=cache_file).validate(df, sig=sig)
+
+    def test_frame_signature_covers_source_and_script(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(validator_module, "SIGNATURE_MIN_CELLS", 4)
+        source = tmp_path / "users.csv"
+        source.write_text("id\n1\n2\n3\n4\n")
+        script = tmp_path / "etl_script.py"
+        script.write_text("df = df.rename(columns={'uid': 'id'})\n")
+        df = pd.DataFrame({'id': [1, 2, 3, 4]})
+        
+        sig = frame_signature(df, str(source), str(script))
+        assert sig is not None
+        assert frame_signature(df.copy(), str(source), str(script)) == sig
+        # Small frames and streams are always validated
+        assert frame_signature(df.head(3), str(source), str(script)) is None
+        assert frame_signature(df, None, str(script)) is None
+        # A healed script or renamed columns never reuse the recorded pass
+        assert frame_signature(df.rename(columns={'id': 'uid'}), str(source), str(script)) != sig
+        script.write_text("df = df.rename(columns={'uid': 'id'}).dropna()\n")
+        assert frame_signature(df, str(source), str(script)) != sig
+
+    @pytest.mark.perf
+    def test_validator_aggregation_large(self, large_validation_df):
+        df = large_validation_df
+        rules = [UniqueRule('id'), NotNullRule('age'), RangeRule('age', min_val=-100, max_val=200)]
+        
+        with pytest.raises(DataValidationError) as excinfo:
+            Validator(rules).validate(df)
+        
+        assert excinfo.value.errors == [
+            f"Column 'id' contains {int(df['id'].duplicated().sum())} duplicate values",
+            f"Column 'age' contains {int(df['age'].isna().sum())} null values",
+        ]
+
+    @pytest.mark.perf
+    def test_validator_success_large(self, large_validation_df):
+        df = large_validation_df
+        rules = [NotNullRule('id'), RangeRule('id', min_val=0, max_val=len(df)), RangeRule('age', min_val=-100, max_val=200)]
+        assert Validator(rules).validate(df) is True